@@ -0,0 +1,193 @@
+"""
+This module implements the universality and inclusion checks of
+automatons with antichains, without determinization.
+
+The subsets of states of the powerset construction (macrostates) are
+explored lazily. A macrostate is dropped when another one already seen
+subsumes it: with a simulation relation <=, S subsumes S' if every state
+of S is simulated by a state of S'. The explored macrostates then form an
+antichain, which is usually much smaller than the DFA.
+
+The sets of states are encoded as integers like in CompiledNfa.
+
+See: https://doi.org/10.1007/978-3-642-12002-2_14 (Abdulla et al.)
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from collections import deque
+
+
+def _closure(fsm, state):
+    """Returns the set of states reached from a state by epsilon-moves."""
+    c = {state}
+    stack = [state]
+    while stack:
+        u = stack.pop()
+        for symbol in fsm.transitions.get(u, ()):
+            if fsm._is_epsilon(symbol):
+                for v in fsm._targets(u, symbol):
+                    if v not in c:
+                        c.add(v)
+                        stack.append(v)
+    return c
+
+
+def _epsilon_free(fsms):
+    """
+    Returns the epsilon-free disjoint union of machines: the list of the
+    initial states, post[j][p] the set of states reached from the state p
+    with the symbol j, the set of accept states and the number of states.
+    The states of the k-th machine are numbered after the ones of the
+    previous machines.
+    """
+    symbols = set()
+    for fsm in fsms:
+        symbols.update(s for s in fsm.symbols if not fsm._is_epsilon(s))
+    symbol_index = {s: j for j, s in enumerate(sorted(symbols, key=repr))}
+    post = [[] for _ in symbol_index]
+    initials = []
+    final = n = 0
+    for fsm in fsms:
+        states = sorted(fsm.states, key=repr)
+        index = {s: n + i for i, s in enumerate(states)}
+        n += len(states)
+        initials.append(index[fsm.initial_state])
+        for row in post:
+            row.extend([0] * len(states))
+        for u in states:
+            p = index[u]
+            for r in _closure(fsm, u):
+                if r in fsm.final_states:
+                    final |= 1 << p
+                for symbol in fsm.transitions.get(r, ()):
+                    if not fsm._is_epsilon(symbol):
+                        row = post[symbol_index[symbol]]
+                        for v in fsm._targets(r, symbol):
+                            for t in _closure(fsm, v):
+                                row[p] |= 1 << index[t]
+    return initials, post, final, n
+
+
+def _bits(m):
+    """Yields the numbers of the bits of an integer which are 1."""
+    while m:
+        low = m & -m
+        yield low.bit_length() - 1
+        m ^= low
+
+
+def _simulation(post, final, n):
+    """
+    Returns the maximal forward simulation of n states: sim[p] is the set
+    of the states q which simulate p (q accepts if p accepts, and each
+    move of p can be followed by q to a state simulating the target).
+    """
+    everything = (1 << n) - 1
+    sim = [final if final >> p & 1 else everything for p in range(n)]
+    changed = True
+    while changed:
+        changed = False
+        for p in range(n):
+            for q in _bits(sim[p]):
+                for row in post:
+                    if any(row[q] & sim[t] == 0 for t in _bits(row[p])):
+                        sim[p] &= ~(1 << q)
+                        changed = True
+                        break
+    return sim
+
+
+def _reduce(macrostate, sim):
+    """Removes from a macrostate the states simulated by another one."""
+    for p in _bits(macrostate):
+        if sim[p] & macrostate & ~(1 << p):
+            macrostate &= ~(1 << p)
+    return macrostate
+
+
+def _subsumes(s, t, sim):
+    """Returns True if each state of s is simulated by a state of t."""
+    return all(sim[p] & t for p in _bits(s))
+
+
+def is_universal(fsm):
+    """
+    Returns True if the machine accepts all the strings over its alphabet
+    (without epsilon).
+    """
+    (initial,), post, final, n = _epsilon_free([fsm])
+    sim = _simulation(post, final, n)
+    start = _reduce(1 << initial, sim)
+    if not start & final:
+        return False
+    antichain = {start}
+    queue = deque([start])
+    while queue:
+        s = queue.popleft()
+        if s not in antichain:
+            continue
+        for row in post:
+            t = 0
+            for p in _bits(s):
+                t |= row[p]
+            t = _reduce(t, sim)
+            if not t & final:
+                return False
+            if any(_subsumes(u, t, sim) for u in antichain):
+                continue
+            antichain = {u for u in antichain if not _subsumes(t, u, sim)}
+            antichain.add(t)
+            queue.append(t)
+    return True
+
+
+def is_subset(a, b):
+    """
+    Returns True if the language of the machine a is included in the
+    language of the machine b.
+
+    A pair (p, S) is a state p of a and a macrostate S of b reached with
+    the same string. It is a counterexample if p accepts and S does not.
+    A pair is dropped if p is simulated by a state of S, or if a pair
+    (p0, S0) already seen has p0 simulating p and S0 subsumes S.
+    """
+    (ia, ib), post, final, n = _epsilon_free([a, b])
+    sim = _simulation(post, final, n)
+
+    def dominated(pair):
+        p, s = pair
+        return sim[p] & s
+
+    def subsumes(pair, other):
+        return sim[other[0]] >> pair[0] & 1 and \
+            _subsumes(pair[1], other[1], sim)
+
+    start = (ia, _reduce(1 << ib, sim))
+    if final >> ia & 1 and not start[1] & final:
+        return False
+    if dominated(start):
+        return True
+    antichain = {start}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        if pair not in antichain:
+            continue
+        p, s = pair
+        for row in post:
+            t = 0
+            for q in _bits(s):
+                t |= row[q]
+            t = _reduce(t, sim)
+            for r in _bits(row[p]):
+                new = (r, t)
+                if final >> r & 1 and not t & final:
+                    return False
+                if dominated(new) or \
+                        any(subsumes(u, new) for u in antichain):
+                    continue
+                antichain = {u for u in antichain if not subsumes(new, u)}
+                antichain.add(new)
+                queue.append(new)
+    return True
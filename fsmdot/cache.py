@@ -0,0 +1,154 @@
+"""
+This module implements a cache of automatons stored on disk.
+
+The results of to_dfa and minimize are stored in a directory with the
+format of the fsmdot.disk module. A result is identified by the operation
+and the canonical hash of the machine, so it can be shared between
+processes. Each state of a stored DFA is named by the canonical numbers
+of the states of the machine it comes from ('0,2,5'), so that a result can be
+renamed for any machine with the same hash. The least recently used
+files are removed when the size of the directory exceeds a limit.
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+import os
+import tempfile
+
+from fsmdot.fsm import Fsm
+from fsmdot.dfa import Dfa
+from fsmdot.disk import DiskDfa, write_dfa
+from fsmdot.error import FsmError
+
+
+def _rename(dfa, names):
+    """Returns a DFA whose states are renamed with a dictionnary."""
+    return Dfa(
+        {names[s] for s in dfa.states},
+        set(dfa.symbols),
+        {
+            names[u]: {symbol: names[v] for symbol, v in row.items()}
+            for u, row in dfa.transitions.items()
+        },
+        names[dfa.initial_state],
+        {names[s] for s in dfa.final_states}
+    )
+
+
+class Cache:
+    """
+    Represents a cache of DFAs stored in a directory.
+
+    - directory is the path of the directory (created if needed)
+    - max_size is the maximum size of the files in bytes
+      (default: 100 MB)
+
+    Use it with the cache argument of Nfa.to_dfa and Dfa.minimize,
+    which give the same results with or without the cache.
+    """
+    SUFFIX = '.db'
+
+    def __init__(self, directory, max_size=100 * 2**20):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_size = max_size
+
+    @property
+    def directory(self):
+        """Returns the path of the directory."""
+        return self._directory
+
+    def _path(self, operation, fsm):
+        """Returns the path of the file of a result."""
+        name = '%s-%s%s' % (operation, fsm.canonical_hash(), Cache.SUFFIX)
+        return os.path.join(self._directory, name)
+
+    def _files(self):
+        """Returns the list of (modification time, size, path) of files."""
+        files = []
+        for name in os.listdir(self._directory):
+            if name.endswith(Cache.SUFFIX):
+                path = os.path.join(self._directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def get(self, operation, fsm, names=Fsm._block_names):
+        """
+        Returns the DFA stored for an operation on a machine,
+        or None if there is no such DFA.
+
+        Each state of the result comes from a set of states of the
+        machine: names is the function which returns the names of the
+        states from the list of these sets (default: the names given by
+        Dfa.minimize).
+        """
+        path = self._path(operation, fsm)
+        try:
+            os.utime(path)
+            disk = DiskDfa(path)
+        except (FileNotFoundError, FsmError):
+            return None
+        with disk:
+            dfa = disk.to_dfa()
+        states = {n: s for s, n in fsm.canonical_numbers().items()}
+        keys = sorted(dfa.states)
+        try:
+            members = [
+                {states[int(i)] for i in key.split(',')} for key in keys
+            ]
+        except (AttributeError, ValueError, KeyError):
+            # File written in another format
+            return None
+        return _rename(dfa, dict(zip(keys, names(members))))
+
+    def put(self, operation, fsm, dfa, members):
+        """
+        Stores the DFA resulting from an operation on a machine. members
+        is a dictionnary containing the set of states of the machine that
+        each state of the DFA comes from.
+        Then the least recently used files are removed if the cache is
+        too large.
+        """
+        numbers = fsm.canonical_numbers()
+        dfa = _rename(dfa, {
+            s: ','.join(str(i) for i in sorted(numbers[u] for u in members[s]))
+            for s in dfa.states
+        })
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self._directory)
+        os.close(fd)
+        try:
+            write_dfa(dfa, tmp)
+            os.replace(tmp, self._path(operation, fsm))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+    def size(self):
+        """Returns the size of the files of the cache in bytes."""
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self):
+        """Removes the least recently used files if the cache is too big."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes all the files of the cache."""
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,252 @@
+"""
+Command-line interface of fsmdot.
+
+The machines are read from JSON files (see Fsm.to_json), newline-delimited
+JSON files (see Fsm.to_ndjson) or files of the on-disk format of the
+fsmdot.disk module. The format is chosen from the extension of the file:
+.json, .ndjson or any other extension for the on-disk format.
+
+Usage:
+    fsmdot to-dfa nfa.json -o dfa.json
+    fsmdot minimize dfa.json -o dfa.db
+    fsmdot dot dfa.json -o dfa.dot
+    fsmdot table dfa.json --format markdown
+    fsmdot match dfa.db words.txt --jobs 4 --stats
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+import sys
+import time
+import argparse
+from itertools import islice
+from multiprocessing import Pool
+
+from fsmdot.fsm import Fsm
+from fsmdot.nfa import Nfa
+from fsmdot.disk import DiskDfa, write_dfa
+from fsmdot.error import FsmError
+
+
+def _load(path):
+    """
+    Loads a machine from a JSON file (.json), a newline-delimited JSON
+    file (.ndjson) or a file of the on-disk format.
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            return Fsm.from_json(f)
+    if path.endswith('.ndjson'):
+        with open(path) as f:
+            return Fsm.from_ndjson(f)
+    with DiskDfa(path) as disk:
+        return disk.to_dfa()
+
+
+def _save(fsm, path):
+    """
+    Writes a DFA to a JSON file, a newline-delimited JSON file, a file of
+    the on-disk format or to stdout if path is None.
+    """
+    if path is None:
+        fsm.to_json(sys.stdout)
+        sys.stdout.write('\n')
+    elif path.endswith('.json'):
+        with open(path, 'w') as f:
+            fsm.to_json(f)
+    elif path.endswith('.ndjson'):
+        with open(path, 'w') as f:
+            fsm.to_ndjson(f)
+    else:
+        write_dfa(fsm, path)
+
+
+def _to_dfa(args):
+    fsm = _load(args.machine)
+    if isinstance(fsm, Nfa):
+        fsm = fsm.to_dfa(max_states=args.max_states)
+    _save(fsm, args.output)
+
+
+def _minimize(args):
+    fsm = _load(args.machine)
+    if isinstance(fsm, Nfa):
+        fsm = fsm.to_dfa(max_states=args.max_states)
+    _save(fsm.minimize(), args.output)
+
+
+def _dot(args):
+    G = _load(args.machine).dot_graph()
+    if args.output is None:
+        print(G.to_string())
+    else:
+        G.write(args.output)
+
+
+def _table(args):
+    fsm = _load(args.machine)
+    if args.format in ('plain', 'csv', 'markdown'):
+        fsm.write_table(fmt=args.format, limit=args.limit)
+    else:
+        print(fsm.tabulate(args.format, limit=args.limit))
+
+
+_worker = None
+
+
+def _init_worker(machine, invert):
+    """Sets the compiled machine of a worker process."""
+    global _worker
+    _worker = (machine, invert)
+
+
+def _accept(machine, line):
+    """
+    Returns True if the line is accepted by the machine. A line which
+    contains a symbol not in the alphabet is rejected.
+    """
+    try:
+        return machine.accept(line)
+    except FsmError:
+        return False
+
+
+def _match_lines(lines):
+    """
+    Returns the number of lines and the list of the lines accepted by the
+    machine of the worker (or rejected if invert is True).
+    """
+    machine, invert = _worker
+    return len(lines), [
+        line for line in lines if _accept(machine, line) != invert
+    ]
+
+
+def _read_lines(paths, chunk_size):
+    """Yields the lines of the files (or stdin) by chunks."""
+    for path in paths or ['-']:
+        f = sys.stdin if path == '-' else open(path)
+        try:
+            lines = (line.rstrip('\n') for line in f)
+            while True:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def _match(args):
+    machine = _load(args.machine).compile()
+    chunks = _read_lines(args.files, args.chunk_size)
+    start = time.perf_counter()
+    if args.jobs > 1:
+        pool = Pool(args.jobs, _init_worker, (machine, args.invert))
+        results = pool.imap(_match_lines, chunks)
+    else:
+        pool = None
+        _init_worker(machine, args.invert)
+        results = map(_match_lines, chunks)
+    total = selected = 0
+    try:
+        for n, lines in results:
+            total += n
+            selected += len(lines)
+            if not args.count:
+                for line in lines:
+                    print(line)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if args.count:
+        print(selected)
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        print(
+            'lines: %d, selected: %d, time: %.3f s, throughput: %.0f lines/s'
+            % (total, selected, elapsed, total / elapsed if elapsed else 0),
+            file=sys.stderr
+        )
+
+
+def _parser():
+    """Returns the parser of the command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog='fsmdot',
+        description='Convert, export and run finite-state machines.'
+    )
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    def command(name, function, help):
+        p = commands.add_parser(name, help=help)
+        p.add_argument(
+            'machine', help='.json, .ndjson or on-disk DFA file'
+        )
+        p.set_defaults(function=function)
+        return p
+
+    for name, function, help in [
+        ('to-dfa', _to_dfa, 'convert a NFA to a DFA'),
+        ('minimize', _minimize, 'minimize a DFA'),
+    ]:
+        p = command(name, function, help)
+        p.add_argument(
+            '-o', '--output',
+            help='output file: .json, .ndjson or on-disk format '
+                 '(default: JSON on stdout)'
+        )
+        p.add_argument(
+            '--max-states', type=int,
+            help='stop if the DFA of a NFA has more states than this'
+        )
+    command('dot', _dot, 'export to dot format').add_argument(
+        '-o', '--output', help='dot file (default: stdout)'
+    )
+    p = command('table', _table, 'print the state-transition table')
+    p.add_argument(
+        '-f', '--format', default='grid',
+        help='plain, csv, markdown or a format of the tabulate library '
+             '(default: grid)'
+    )
+    p.add_argument('-n', '--limit', type=int, help='number of states')
+    p = command('match', _match, 'print the lines accepted by the machine')
+    p.add_argument('files', nargs='*', help='input files (default: stdin)')
+    p.add_argument(
+        '-j', '--jobs', type=int, default=1, help='number of processes'
+    )
+    p.add_argument(
+        '-v', '--invert', action='store_true',
+        help='print the rejected lines'
+    )
+    p.add_argument(
+        '-c', '--count', action='store_true',
+        help='print only the number of selected lines'
+    )
+    p.add_argument(
+        '-s', '--stats', action='store_true',
+        help='print throughput statistics on stderr'
+    )
+    p.add_argument(
+        '--chunk-size', type=int, default=1000,
+        help='number of lines sent to a process at once'
+    )
+    return parser
+
+
+def main(argv=None):
+    """Runs the command-line interface."""
+    args = _parser().parse_args(argv)
+    try:
+        args.function(args)
+    except (FsmError, OSError) as e:
+        print('fsmdot: %s' % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+This module generates the Python source of matchers specialized for a DFA.
+
+Each state becomes a dictionnary symbol -> dictionnary of the next state,
+so reading a symbol is a single lookup, without any table indexing. The
+generated module only depends on fsmdot.error and can be written to disk
+to be imported on startup.
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+import ast
+
+from fsmdot.error import FsmError
+
+_TEMPLATE = '''"""
+Matcher generated by fsmdot for a DFA with %(count)d states.
+"""
+from fsmdot.error import FsmError
+
+%(states)s
+
+SYMBOLS = frozenset(%(symbols)s)
+FINAL = frozenset(map(id, [%(final)s]))
+
+
+def accept(string):
+    """Returns True if the string is accepted by the DFA."""
+    state = S%(initial)d
+    try:
+        for symbol in string:
+            state = state[symbol]
+    except KeyError:
+        if symbol not in SYMBOLS:
+            raise FsmError('%%s is not a symbol' %% symbol)
+        return False
+    return id(state) in FINAL
+'''
+
+
+def _literal(value):
+    """Returns the repr of a value, which must be a Python literal."""
+    r = repr(value)
+    try:
+        if ast.literal_eval(r) == value:
+            return r
+    except (ValueError, SyntaxError):
+        pass
+    raise FsmError('%s cannot be written in Python source' % r)
+
+
+def python_source(dfa):
+    """
+    Returns the source of a Python module defining the function
+    accept(string) of a DFA. Only the reachable states are written.
+    """
+    t = dfa.compile()
+    m = len(t.symbols)
+    symbols = [_literal(s) for s in t.symbols]
+    states = sorted(t.reachable())
+    lines = ['S%d = dict()' % i for i in states]
+    for i in states:
+        row = [
+            '%s: S%d' % (symbols[j], t.table[i * m + j])
+            for j in range(m) if t.table[i * m + j] >= 0
+        ]
+        if row:
+            lines.append('S%d.update({%s})' % (i, ', '.join(row)))
+    return _TEMPLATE % {
+        'count': len(states),
+        'states': '\n'.join(lines),
+        'symbols': '[%s]' % ', '.join(symbols),
+        'final': ', '.join('S%d' % i for i in states if t.final[i]),
+        'initial': t.initial
+    }
+
+
+def load_source(source):
+    """Executes the source of a matcher and returns its accept function."""
+    namespace = dict()
+    exec(compile(source, '<fsmdot>', 'exec'), namespace)
+    return namespace['accept']
@@ -0,0 +1,370 @@
+"""
+This module implements compiled forms of automatons.
+
+The states and the symbols are numbered so that the transitions can be
+stored in arrays of integers instead of nested dictionnaries.
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from array import array
+
+from fsmdot.error import FsmError
+
+
+class CompiledDfa:
+    """
+    Represents a DFA compiled in a transition table.
+
+    - states is the list of states: a state is numbered by its index
+    - symbols is the sorted list of symbols
+    - table is an array of len(states) * len(symbols) integers:
+      table[i * len(symbols) + j] is the number of the next state from
+      the state i with the symbol j, or -1 if there is no transition
+    - final is a bytearray: final[i] is 1 if the state i is an accept state
+    - initial is the number of the initial state
+    """
+    def __init__(self, dfa):
+        self.states = sorted(dfa.states, key=repr)
+        self.symbols = sorted(dfa.symbols, key=repr)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        self.symbol_index = {s: j for j, s in enumerate(self.symbols)}
+        m = len(self.symbols)
+        self.table = array('l', [-1]) * (len(self.states) * m)
+        for u, row in dfa.transitions.items():
+            i = self.state_index[u] * m
+            for s, v in row.items():
+                self.table[i + self.symbol_index[s]] = self.state_index[v]
+        self.final = bytearray(len(self.states))
+        for s in dfa.final_states:
+            self.final[self.state_index[s]] = 1
+        self.initial = self.state_index[dfa.initial_state]
+        self.chars = all(
+            isinstance(s, str) and len(s) == 1 for s in self.symbols
+        )
+        self._reachable = None
+
+    def apply(self, dfa, change, *args):
+        """
+        Updates the table after a modification of the DFA (see
+        Fsm._update). Returns False if the table must be rebuilt.
+        """
+        m = len(self.symbols)
+        if change == 'add_state':
+            state, final = args
+            self.state_index[state] = len(self.states)
+            self.states.append(state)
+            self.table.extend([-1] * m)
+            self.final.append(1 if final else 0)
+        elif change == 'set_final':
+            state, final = args
+            self.final[self.state_index[state]] = 1 if final else 0
+        elif change in ('add_transition', 'remove_transition'):
+            state, symbol, target = args
+            i = self.state_index[state] * m + self.symbol_index[symbol]
+            previous = self.table[i]
+            if change == 'add_transition':
+                self.table[i] = self.state_index[target]
+            else:
+                self.table[i] = -1
+            if self._reachable is not None:
+                if previous >= 0 and previous != self.table[i]:
+                    # Some states may be unreachable now
+                    self._reachable = None
+                elif self.state_index[state] in self._reachable:
+                    self._explore([self.table[i]])
+        else:
+            return False
+        return True
+
+    def _explore(self, states):
+        """Adds to the reachable states the states reached from states."""
+        m = len(self.symbols)
+        queue = [i for i in states if i not in self._reachable]
+        self._reachable.update(queue)
+        for i in queue:
+            for k in self.table[i * m:(i + 1) * m]:
+                if k >= 0 and k not in self._reachable:
+                    self._reachable.add(k)
+                    queue.append(k)
+
+    def reachable(self):
+        """
+        Returns the set of the numbers of the states reachable from the
+        initial state. It is updated incrementally when transitions are
+        added.
+        """
+        if self._reachable is None:
+            self._reachable = set()
+            self._explore([self.initial])
+        return self._reachable
+
+    def word(self, symbols):
+        """
+        Returns a list of symbols as a string if all symbols are
+        characters, else as a tuple.
+        """
+        return ''.join(symbols) if self.chars else tuple(symbols)
+
+    def run(self, string, state=None):
+        """
+        Returns the number of the state reached after reading the string
+        from a state (default: the initial state), or -1 if there is no
+        transition.
+        """
+        table, m = self.table, len(self.symbols)
+        symbol_index = self.symbol_index
+        if state is None:
+            state = self.initial
+        for symbol in string:
+            j = symbol_index.get(symbol)
+            if j is None:
+                raise FsmError('%s is not a symbol' % symbol)
+            state = table[state * m + j]
+            if state < 0:
+                return -1
+        return state
+
+    def accept(self, string):
+        """Returns True if the string is accepted by the DFA."""
+        state = self.run(string)
+        return state >= 0 and self.final[state] == 1
+
+
+class CompiledNfa:
+    """
+    Represents a NFA compiled for a bit-parallel simulation.
+
+    A set of states is encoded as an integer: the state i is in the set
+    if the bit i is 1. The sets are always closed under epsilon-moves.
+
+    - states is the list of states: a state is numbered by its index
+    - symbols is the sorted list of symbols
+    - closure[i] is the epsilon closure of the state i
+    - succ[j][i] is the union of the epsilon closures of the states
+      reached from the state i with the symbol j
+    - initial is the epsilon closure of the initial state
+    - final is the set of accept states
+
+    For small NFAs (at most byte_limit states), byte tables are also
+    computed: tables[j][c][b] is the union of succ[j][8 * c + k] for all
+    the bits k of the byte b. A step is then one lookup by byte of the
+    current set instead of one by state.
+    """
+    def __init__(self, nfa, byte_limit=512):
+        self.states = sorted(nfa.states, key=repr)
+        self.symbols = sorted(nfa.symbols, key=repr)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        self.symbol_index = {s: j for j, s in enumerate(self.symbols)}
+        self.closure = [
+            self.mask(nfa.epsilon_closure(s)) for s in self.states
+        ]
+        self.succ = [
+            [self._successors(nfa, s, symbol) for s in self.states]
+            for symbol in self.symbols
+        ]
+        self.initial = self.closure[self.state_index[nfa.initial_state]]
+        self.final = self.mask(nfa.final_states)
+        self.byte_limit = byte_limit
+        self.tables = None
+        if len(self.states) <= byte_limit:
+            self.tables = [
+                self._byte_tables(j) for j in range(len(self.symbols))
+            ]
+
+    def apply(self, nfa, change, *args):
+        """
+        Updates the compiled NFA after a modification of the NFA (see
+        Fsm._update). Returns False if it must be rebuilt, which is the
+        case when the alphabet or the epsilon-moves change.
+        """
+        if change == 'add_state':
+            state, final = args
+            i = len(self.states)
+            self.state_index[state] = i
+            self.states.append(state)
+            self.closure.append(1 << i)
+            for succ in self.succ:
+                succ.append(0)
+            if final:
+                self.final |= 1 << i
+            if self.tables is not None:
+                if i >= self.byte_limit:
+                    self.tables = None
+                elif i % 8 == 0:
+                    for tables in self.tables:
+                        tables.append([0] * 256)
+        elif change == 'set_final':
+            state, final = args
+            bit = 1 << self.state_index[state]
+            self.final = self.final | bit if final else self.final & ~bit
+        elif change in ('add_transition', 'remove_transition'):
+            state, symbol, target = args
+            if symbol == nfa.EPSILON:
+                return False
+            i, j = self.state_index[state], self.symbol_index[symbol]
+            if change == 'add_transition':
+                self.succ[j][i] |= self.closure[self.state_index[target]]
+            else:
+                self.succ[j][i] = self._successors(nfa, state, symbol)
+            if self.tables is not None:
+                self.tables[j][i // 8] = self._byte_table(j, i - i % 8)
+        else:
+            return False
+        return True
+
+    def mask(self, states):
+        """Returns the integer encoding a set of states."""
+        m = 0
+        for s in states:
+            m |= 1 << self.state_index[s]
+        return m
+
+    def unmask(self, m):
+        """Returns the set of states encoded by an integer."""
+        states = set()
+        while m:
+            low = m & -m
+            states.add(self.states[low.bit_length() - 1])
+            m ^= low
+        return states
+
+    def _successors(self, nfa, state, symbol):
+        """Returns succ[j][i] for a state and a symbol."""
+        m = 0
+        for t in nfa.delta(state, symbol):
+            m |= self.closure[self.state_index[t]]
+        return m
+
+    def _byte_table(self, j, c):
+        """Returns the byte table of the symbol j for the states c to c + 7."""
+        succ, n = self.succ[j], len(self.states)
+        table = [0] * 256
+        for b in range(1, 256):
+            low = b & -b
+            k = c + low.bit_length() - 1
+            table[b] = table[b ^ low] | (succ[k] if k < n else 0)
+        return table
+
+    def _byte_tables(self, j):
+        """Returns the byte tables of the symbol j."""
+        return [self._byte_table(j, c) for c in range(0, len(self.states), 8)]
+
+    def step(self, current, j):
+        """
+        Returns the set of states reached from the set current with the
+        symbol j.
+        """
+        new = 0
+        if self.tables is not None:
+            c = 0
+            tables = self.tables[j]
+            while current:
+                b = current & 255
+                if b:
+                    new |= tables[c][b]
+                current >>= 8
+                c += 1
+        else:
+            succ = self.succ[j]
+            while current:
+                low = current & -current
+                new |= succ[low.bit_length() - 1]
+                current ^= low
+        return new
+
+    def run(self, string, current=None):
+        """
+        Returns the set of states reached after reading the string from
+        a set of states (default: the epsilon closure of the initial state).
+        """
+        symbol_index = self.symbol_index
+        if current is None:
+            current = self.initial
+        for symbol in string:
+            if not current:
+                break
+            j = symbol_index.get(symbol)
+            if j is None:
+                raise FsmError('%s is not a symbol' % symbol)
+            current = self.step(current, j)
+        return current
+
+    def accept(self, string):
+        """Returns True if the string is accepted by the NFA."""
+        return bool(self.run(string) & self.final)
+
+
+class CompiledTransducer(CompiledDfa):
+    """
+    Represents a Mealy or Moore machine compiled in a transition table.
+
+    The attributes are the ones of CompiledDfa, plus:
+    - outputs is a list with the same length as table: outputs[i] is the
+      output of the transition i
+    - first is the output written before reading the input: the output
+      of the initial state for a Moore machine, None for a Mealy machine
+    """
+    def __init__(self, fsm):
+        super().__init__(fsm)
+        m = len(self.symbols)
+        self.outputs = [None] * len(self.table)
+        for i, u in enumerate(self.states):
+            for j, s in enumerate(self.symbols):
+                if self.table[i * m + j] >= 0:
+                    self.outputs[i * m + j] = fsm.output(u, s)
+        self.first = fsm.first_output()
+
+    def apply(self, fsm, change, *args):
+        """
+        Updates the table after a modification of the machine (see
+        Fsm._update). Returns False if the table must be rebuilt.
+        """
+        if not super().apply(fsm, change, *args):
+            return False
+        if change == 'add_state':
+            self.outputs.extend([None] * len(self.symbols))
+        elif change == 'add_transition':
+            state, symbol, _ = args
+            i = self.state_index[state] * len(self.symbols)
+            i += self.symbol_index[symbol]
+            self.outputs[i] = fsm.output(state, symbol)
+        return True
+
+    def transduce(self, string, out=None, state=None):
+        """
+        Reads a string from a state (default: the initial state).
+
+        If out is None, it returns the list of outputs and the number of
+        the last state. Else the outputs are written in the preallocated
+        buffer out (a list, a bytearray...) from the index 0 and it returns
+        the number of outputs written and the number of the last state.
+        """
+        table, outputs, m = self.table, self.outputs, len(self.symbols)
+        symbol_index = self.symbol_index
+        result = [] if out is None else out
+        k = 0
+        if state is None:
+            state = self.initial
+            if self.first is not None:
+                if out is None:
+                    result.append(self.first)
+                else:
+                    result[0] = self.first
+                k = 1
+        for symbol in string:
+            j = symbol_index.get(symbol)
+            if j is None:
+                raise FsmError('%s is not a symbol' % symbol)
+            i = state * m + j
+            state = table[i]
+            if state < 0:
+                raise FsmError('There is no transition from %s with %s' % (
+                    self.states[i // m], symbol
+                ))
+            if out is None:
+                result.append(outputs[i])
+            else:
+                result[k] = outputs[i]
+            k += 1
+        return (result if out is None else k), state
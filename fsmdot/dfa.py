@@ -6,7 +6,13 @@ See: https://en.wikipedia.org/wiki/Deterministic_finite_automaton
 Author: Quentin Deschamps
 Date: 2020
 """
+import random
+
 from fsmdot.fsm import Fsm
+from fsmdot.compiled import CompiledDfa
+from fsmdot.codegen import python_source, load_source
+from fsmdot.parallel import accept_parallel
+from fsmdot.error import FsmError
 
 
 class Dfa(Fsm):
@@ -21,9 +27,93 @@ class Dfa(Fsm):
 
     See: https://en.wikipedia.org/wiki/Deterministic_finite_automaton
     """
+    _json_type = 'dfa'
+
     def __init__(self, Q, S, d, q0, F):
         super().__init__(Q, S, d, q0, F, True)
 
+    @classmethod
+    def from_words(cls, words):
+        """
+        Returns the minimal DFA accepting exactly the words of an iterable.
+
+        The words must be sorted. The DFA is built incrementally with the
+        algorithm of Daciuk et al.: the part of the previous word which is
+        not a prefix of the current word is minimized using a register of
+        states, so the memory used is proportional to the final automaton.
+
+        The states of the DFA are integers and the initial state is 0.
+
+        See: https://aclanthology.org/J00-1002/
+        """
+        edges = {0: dict()}
+        final = set()
+        register = dict()
+        symbols = set()
+        path = [0]
+        previous = None
+        count = 1
+
+        def replace_or_register(depth):
+            """Minimizes the states of path after depth."""
+            for i in range(len(path) - 1, depth, -1):
+                child = path.pop()
+                signature = (
+                    child in final, frozenset(edges[child].items())
+                )
+                if signature in register:
+                    edges[path[-1]][previous[i - 1]] = register[signature]
+                    del edges[child]
+                    final.discard(child)
+                else:
+                    register[signature] = child
+
+        for word in words:
+            if previous is not None:
+                if word < previous:
+                    raise FsmError('The words must be sorted')
+                if word == previous:
+                    continue
+            # Length of the common prefix with the previous word
+            prefix = 0
+            if previous is not None:
+                n = min(len(word), len(previous))
+                while prefix < n and word[prefix] == previous[prefix]:
+                    prefix += 1
+                replace_or_register(prefix)
+            # Add the suffix
+            for symbol in word[prefix:]:
+                edges[count] = dict()
+                edges[path[-1]][symbol] = count
+                path.append(count)
+                symbols.add(symbol)
+                count += 1
+            final.add(path[-1])
+            previous = word
+        if previous is not None:
+            replace_or_register(0)
+
+        # Number the states in breadth-first order
+        names = {0: 0}
+        queue = [0]
+        for u in queue:
+            for symbol in sorted(edges[u], key=repr):
+                v = edges[u][symbol]
+                if v not in names:
+                    names[v] = len(names)
+                    queue.append(v)
+        transitions = {
+            names[u]: {s: names[v] for s, v in edges[u].items()}
+            for u in queue if edges[u]
+        }
+        return cls(
+            set(names.values()),
+            symbols,
+            transitions,
+            0,
+            {names[u] for u in final}
+        )
+
     def accept(self, string):
         """Returns True if the string is accepted by the DFA."""
         state = self._initial_state
@@ -33,29 +123,347 @@ class Dfa(Fsm):
                 return False
         return state in self._final_states
 
+    def compile(self):
+        """
+        Returns the DFA compiled in a transition table (CompiledDfa).
+        The result is cached until the DFA is modified with its methods.
+        """
+        if 'compiled' not in self._cache:
+            self._cache['compiled'] = CompiledDfa(self)
+        return self._cache['compiled']
+
+    def accept_parallel(self, iterable, workers=None, chunk_size=1000):
+        """
+        Yields the results of accept for the strings of an iterable, in
+        order, computed by several processes (default: one by CPU).
+
+        The compiled transition table is placed in shared memory once and
+        the strings are sent to the processes by chunks of chunk_size
+        (see fsmdot.parallel).
+        """
+        return accept_parallel(self, iterable, workers, chunk_size)
+
+    def compile_to_python(self, path=None):
+        """
+        Returns a function accept(string) specialized for the DFA: the
+        source of a Python module is generated (see fsmdot.codegen), then
+        executed. The function is cached until the DFA is modified with
+        its methods.
+
+        If path is given, the module is also written to this file so that
+        it can be imported without the DFA.
+        """
+        if path is not None:
+            source = python_source(self)
+            with open(path, 'w') as f:
+                f.write(source)
+            if 'python' not in self._cache:
+                self._cache['python'] = load_source(source)
+        elif 'python' not in self._cache:
+            self._cache['python'] = load_source(python_source(self))
+        return self._cache['python']
+
+    def count(self, n):
+        """
+        Returns the number of strings of length less than or equal to n
+        accepted by the DFA.
+
+        It uses dynamic programming over the transition table: the number
+        of strings of each length leading to each state is computed
+        from the previous length.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        v = [0] * len(t.states)
+        v[t.initial] = 1
+        total = 0
+        for length in range(n + 1):
+            total += sum(c for i, c in enumerate(v) if t.final[i])
+            if length == n:
+                break
+            w = [0] * len(t.states)
+            for i, c in enumerate(v):
+                if c:
+                    for k in t.table[i * m:(i + 1) * m]:
+                        if k >= 0:
+                            w[k] += c
+            v = w
+        return total
+
+    def shortest(self):
+        """
+        Returns the shortest string accepted by the DFA, or None if the
+        DFA accepts no string. If there are several shortest strings,
+        the first one in lexicographic order of symbols is returned.
+
+        The string is a str if all symbols are characters, else a tuple
+        of symbols.
+
+        It uses a breadth-first search from the initial state.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        parents = {t.initial: None}
+        queue = [t.initial]
+        for i in queue:
+            if t.final[i]:
+                word = []
+                while parents[i] is not None:
+                    i, j = parents[i]
+                    word.append(t.symbols[j])
+                return t.word(reversed(word))
+            for j in range(m):
+                k = t.table[i * m + j]
+                if k >= 0 and k not in parents:
+                    parents[k] = (i, j)
+                    queue.append(k)
+        return None
+
+    def _alive(self, n):
+        """
+        Returns a list of n + 1 sets: the set number r contains the
+        numbers of the states from which a string of length r is accepted.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        alive = [{i for i in range(len(t.states)) if t.final[i]}]
+        for _ in range(n):
+            previous = alive[-1]
+            alive.append({
+                i for i in range(len(t.states))
+                if any(k in previous for k in t.table[i * m:(i + 1) * m])
+            })
+        return alive
+
+    def enumerate(self, max_len):
+        """
+        Yields the strings accepted by the DFA of length less than or equal
+        to max_len, sorted by length then in lexicographic order of symbols.
+
+        The strings are str if all symbols are characters, else tuples
+        of symbols. Only the branches leading to an accepted string of
+        the current length are explored.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        alive = self._alive(max_len)
+        for length in range(max_len + 1):
+            if t.initial not in alive[length]:
+                continue
+            states, next_symbols, word = [t.initial], [0], []
+            while states:
+                depth = len(word)
+                if depth == length:
+                    yield t.word(word)
+                    j = m
+                else:
+                    i, j = states[-1], next_symbols[-1]
+                    target = alive[length - depth - 1]
+                    while j < m and t.table[i * m + j] not in target:
+                        j += 1
+                if j >= m:
+                    states.pop()
+                    next_symbols.pop()
+                    if word:
+                        word.pop()
+                    continue
+                next_symbols[-1] = j + 1
+                states.append(t.table[i * m + j])
+                next_symbols.append(0)
+                word.append(t.symbols[j])
+
+    def sample(self, k, length, rng=None):
+        """
+        Returns a list of k strings of the given length chosen uniformly
+        at random among the strings accepted by the DFA.
+
+        The number of accepted strings of each length from each state is
+        computed by dynamic programming, then each string is built symbol
+        by symbol with probabilities proportional to these numbers.
+        You can give a random.Random instance with the rng argument.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        rng = rng or random
+        counts = [list(t.final)]
+        for _ in range(length):
+            previous = counts[-1]
+            counts.append([
+                sum(previous[k] for k in t.table[i * m:(i + 1) * m] if k >= 0)
+                for i in range(len(t.states))
+            ])
+        if not counts[length][t.initial]:
+            raise FsmError('No string of length %d is accepted' % length)
+        words = []
+        for _ in range(k):
+            i, word = t.initial, []
+            for r in range(length, 0, -1):
+                x = rng.randrange(counts[r][i])
+                for j in range(m):
+                    n = t.table[i * m + j]
+                    c = counts[r - 1][n] if n >= 0 else 0
+                    if x < c:
+                        break
+                    x -= c
+                i = n
+                word.append(t.symbols[j])
+            words.append(t.word(word))
+        return words
+
+    def reverse(self):
+        """
+        Returns the NFA accepting the reverse of the strings accepted by
+        the DFA (see Nfa.reverse).
+        """
+        from fsmdot.nfa import Nfa
+        return Nfa._reverse(self)
+
+    def renumber(self):
+        """
+        Returns an equivalent DFA whose states are the numbers of the
+        reachable states in breadth-first order from the initial state,
+        the symbols being sorted.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+        numbers = {t.initial: 0}
+        queue = [t.initial]
+        transitions = dict()
+        for i in queue:
+            row = dict()
+            for j in range(m):
+                k = t.table[i * m + j]
+                if k >= 0:
+                    if k not in numbers:
+                        numbers[k] = len(numbers)
+                        queue.append(k)
+                    row[t.symbols[j]] = numbers[k]
+            if row:
+                transitions[numbers[i]] = row
+        return Dfa(
+            set(numbers.values()),
+            set(self._symbols),
+            transitions,
+            0,
+            {numbers[i] for i in queue if t.final[i]}
+        )
+
     def unreachable_states(self):
         """
         Returns the set of unreachable states of the DFA.
+        The reachable states are kept up to date when transitions are
+        added.
 
         See: https://en.wikipedia.org/wiki/DFA_minimization#Unreachable_states
         """
-        reachable_states = {self._initial_state}
-        new_states = {self._initial_state}
-        while new_states:
-            temp = set()
-            for state in new_states:
-                for symbol in self._symbols:
-                    temp.add(self.delta(state, symbol))
-            new_states = temp.difference(reachable_states)
-            reachable_states.update(new_states)
-        return set(self._states).difference(reachable_states)
+        t = self.compile()
+        reachable = t.reachable()
+        return {s for i, s in enumerate(t.states) if i not in reachable}
 
-    def minimize(self):
+    def minimize(self, cache=None):
         """
         Transforms a DFA into an equivalent DFA that has a minimum number
         of states.
 
+        It removes the unreachable states then uses Hopcroft's algorithm
+        to merge the equivalent states. A merged state is named like the
+        states of the powerset construction: {S1, S2}, and then the other
+        states are named with str. The states from which no string is
+        accepted are removed.
+
+        You can give a Cache with the cache argument to store the result
+        on disk and reuse it for machines with the same canonical hash.
+
         See:
         https://en.wikipedia.org/wiki/DFA_minimization
         """
-        pass
+        if cache is not None:
+            dfa = cache.get('minimize', self)
+            if dfa is None:
+                members = dict()
+                dfa = self._minimize(members)
+                cache.put('minimize', self, dfa, members)
+            return dfa
+        return self._minimize()
+
+    def _minimize(self, members=None):
+        """
+        Hopcroft's algorithm used by minimize. If members is a
+        dictionnary, the set of states merged in each state of the
+        minimal DFA is added to it.
+        """
+        t = self.compile()
+        m = len(t.symbols)
+
+        # Reachable states
+        reachable = [t.initial]
+        seen = {t.initial}
+        for i in reachable:
+            for k in t.table[i * m:(i + 1) * m]:
+                if k >= 0 and k not in seen:
+                    seen.add(k)
+                    reachable.append(k)
+
+        # Inverse transitions, -1 being a dead state
+        inverse = [dict() for _ in range(m)]
+        for i in reachable:
+            for j, k in enumerate(t.table[i * m:(i + 1) * m]):
+                inverse[j].setdefault(k, []).append(i)
+        for j in range(m):
+            inverse[j].setdefault(-1, []).append(-1)
+
+        # Hopcroft's algorithm
+        final = {i for i in reachable if t.final[i]}
+        blocks = [b for b in (final, seen - final | {-1}) if b]
+        block_of = {i: b for b, block in enumerate(blocks) for i in block}
+        waiting = list(range(len(blocks)))
+        while waiting:
+            a = waiting.pop()
+            splitter = list(blocks[a])
+            for j in range(m):
+                touched = dict()
+                for k in splitter:
+                    for i in inverse[j].get(k, ()):
+                        touched.setdefault(block_of[i], set()).add(i)
+                for b, inter in touched.items():
+                    if len(inter) == len(blocks[b]):
+                        continue
+                    rest = blocks[b] - inter
+                    small, large = sorted((inter, rest), key=len)
+                    blocks[b] = large
+                    blocks.append(small)
+                    for i in small:
+                        block_of[i] = len(blocks) - 1
+                    waiting.append(len(blocks) - 1)
+
+        # Build the minimal DFA
+        dead = block_of[-1]
+        names = dict()
+        if block_of[t.initial] == dead:
+            # The DFA accepts no string
+            names[dead] = self._initial_state
+        kept = [b for b in range(len(blocks)) if b != dead]
+        names.update(zip(kept, Fsm._block_names(
+            [{t.states[i] for i in blocks[b]} for b in kept]
+        )))
+        transitions = dict()
+        for b in names:
+            i = next(i for i in blocks[b] if i >= 0)
+            row = dict()
+            for j, k in enumerate(t.table[i * m:(i + 1) * m]):
+                if k >= 0 and block_of[k] != dead:
+                    row[t.symbols[j]] = names[block_of[k]]
+            if row:
+                transitions[names[b]] = row
+        if members is not None:
+            for b in names:
+                members[names[b]] = {t.states[i] for i in blocks[b] if i >= 0}
+            if block_of[t.initial] == dead:
+                members[names[dead]] = {self._initial_state}
+        return Dfa(
+            set(names.values()),
+            set(self._symbols),
+            transitions,
+            names[block_of[t.initial]],
+            {names[b] for b in names if blocks[b] & final}
+        )
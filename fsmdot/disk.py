@@ -0,0 +1,209 @@
+"""
+This module implements deterministic finite automatons stored on disk.
+
+A DFA is stored in a SQLite database with the following tables:
+
+- meta(key, value): the initial state
+- symbols(id, symbol): the input alphabet
+- states(id, name, final): the states and the accept states
+- transitions(src, symbol, dst): the state-transition function
+
+Symbols and state names are stored with repr and loaded with
+ast.literal_eval, so they must be Python literals (str, int...).
+
+See: https://docs.python.org/3/library/sqlite3.html
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+import os
+import ast
+import sqlite3
+from functools import lru_cache
+
+from fsmdot.dfa import Dfa
+from fsmdot.error import FsmError
+
+_SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE symbols (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL UNIQUE
+);
+CREATE TABLE states (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    final INTEGER NOT NULL
+);
+CREATE TABLE transitions (
+    src INTEGER NOT NULL,
+    symbol INTEGER NOT NULL,
+    dst INTEGER NOT NULL,
+    PRIMARY KEY (src, symbol)
+) WITHOUT ROWID;
+"""
+
+
+def _create(path):
+    """Creates an empty database for a DFA and returns the connection."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _finalize(conn, symbols, initial_state):
+    """Writes the alphabet and the initial state and compacts the file."""
+    conn.executemany(
+        'INSERT INTO symbols VALUES (?, ?)',
+        ((i, repr(s)) for i, s in enumerate(symbols))
+    )
+    conn.execute(
+        'INSERT INTO meta VALUES (?, ?)', ('initial', str(initial_state))
+    )
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+
+
+def write_dfa(dfa, path):
+    """
+    Writes a DFA to a file using the on-disk format.
+    The file can be opened with DiskDfa.
+    """
+    conn = _create(path)
+    symbols = sorted(dfa.symbols, key=repr)
+    symbol_ids = {s: i for i, s in enumerate(symbols)}
+    states = sorted(dfa.states, key=repr)
+    state_ids = {s: i for i, s in enumerate(states)}
+    conn.executemany(
+        'INSERT INTO states VALUES (?, ?, ?)',
+        ((i, repr(s), s in dfa.final_states) for i, s in enumerate(states))
+    )
+    conn.executemany(
+        'INSERT INTO transitions VALUES (?, ?, ?)',
+        (
+            (state_ids[u], symbol_ids[s], state_ids[v])
+            for u in dfa.transitions
+            for s, v in dfa.transitions[u].items()
+        )
+    )
+    _finalize(conn, symbols, state_ids[dfa.initial_state])
+
+
+class DiskDfa:
+    """
+    Represents a deterministic finite automaton stored on disk.
+
+    Only the alphabet is loaded in memory. The transitions are read from
+    the database when needed and the last used rows are kept in a cache
+    of cache_size states.
+    """
+    def __init__(self, path, cache_size=4096):
+        if not os.path.exists(path):
+            raise FsmError('%s does not exist' % path)
+        self._path = path
+        self._conn = sqlite3.connect(path)
+        try:
+            rows = self._conn.execute('SELECT id, symbol FROM symbols')
+            self._symbol_ids = {ast.literal_eval(s): i for i, s in rows}
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'initial'"
+            ).fetchone()
+        except sqlite3.DatabaseError:
+            self._conn.close()
+            raise FsmError('%s is not a DFA file' % path)
+        self._initial_state = int(row[0])
+        self._row = lru_cache(maxsize=cache_size)(self._read_row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """Returns the number of states."""
+        return self._conn.execute('SELECT COUNT(*) FROM states').fetchone()[0]
+
+    def close(self):
+        """Closes the database."""
+        self._conn.close()
+
+    @property
+    def path(self):
+        """Returns the path of the database."""
+        return self._path
+
+    @property
+    def symbols(self):
+        """Returns the input alphabet."""
+        return set(self._symbol_ids)
+
+    @property
+    def initial_state(self):
+        """Returns the id of the initial state."""
+        return self._initial_state
+
+    def name(self, state):
+        """Returns the name of a state from its id."""
+        row = self._conn.execute(
+            'SELECT name FROM states WHERE id = ?', (state,)
+        ).fetchone()
+        if row is None:
+            raise FsmError('%s is not a state' % state)
+        return ast.literal_eval(row[0])
+
+    def is_final(self, state):
+        """Returns True if the state with this id is an accept state."""
+        row = self._conn.execute(
+            'SELECT final FROM states WHERE id = ?', (state,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def _read_row(self, state):
+        """Returns the transitions of a state as a dict symbol id -> id."""
+        return dict(self._conn.execute(
+            'SELECT symbol, dst FROM transitions WHERE src = ?', (state,)
+        ))
+
+    def delta(self, state, symbol):
+        """
+        State-transition function working on state ids.
+        It returns None if there is no transition.
+        """
+        if symbol not in self._symbol_ids:
+            raise FsmError('%s is not a symbol' % symbol)
+        return self._row(state).get(self._symbol_ids[symbol])
+
+    def accept(self, string):
+        """Returns True if the string is accepted by the DFA."""
+        state = self._initial_state
+        for symbol in string:
+            state = self.delta(state, symbol)
+            if state is None:
+                return False
+        return self.is_final(state)
+
+    def to_dfa(self):
+        """Loads the whole automaton in memory and returns a Dfa."""
+        symbols = {i: s for s, i in self._symbol_ids.items()}
+        names, final_states = {}, set()
+        for i, name, final in self._conn.execute('SELECT * FROM states'):
+            names[i] = ast.literal_eval(name)
+            if final:
+                final_states.add(names[i])
+        transitions = dict()
+        for u, s, v in self._conn.execute('SELECT * FROM transitions'):
+            transitions.setdefault(names[u], dict())[symbols[s]] = names[v]
+        return Dfa(
+            set(names.values()),
+            set(self._symbol_ids),
+            transitions,
+            names[self._initial_state],
+            final_states
+        )
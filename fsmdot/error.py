@@ -9,3 +9,8 @@ Date: 2020
 class FsmError(Exception):
     """Raises fsm exceptions."""
     pass
+
+
+class StateLimitError(FsmError):
+    """Raises when a construction exceeds its limit of states."""
+    pass
@@ -6,6 +6,13 @@ See: https://en.wikipedia.org/wiki/Finite-state_machine
 Author: Quentin Deschamps
 Date: 2020
 """
+import sys
+import csv
+import json
+import heapq
+import types
+import hashlib
+import builtins
 from abc import ABC
 from tabulate import tabulate
 import pygraphviz as pgv
@@ -25,6 +32,8 @@ class Fsm(ABC):
 
     See: https://en.wikipedia.org/wiki/Finite-state_machine
     """
+    _json_type = None
+
     def __init__(self, Q, S, d, q0, F, is_deterministic):
         if q0 not in Q:
             raise FsmError('Q does not contain q0')
@@ -38,6 +47,7 @@ class Fsm(ABC):
         self._initial_state = q0
         self._final_states = F
         self._is_deterministic = is_deterministic
+        self._cache = dict()
 
     @staticmethod
     def _valid_transitions(Q, S, d, is_deterministic):
@@ -76,6 +86,28 @@ class Fsm(ABC):
                                 '%s is not in the set of states' % t
                             )
 
+    @staticmethod
+    def _set_to_state(s):
+        """Transforms a set of states to a new state."""
+        return '{' + ', '.join(sorted(str(i) for i in s)) + '}'
+
+    @staticmethod
+    def _block_names(blocks):
+        """
+        Returns the names of the states merging blocks of states (a list
+        of sets). If a block has several states, it is named like the
+        states of the powerset construction ({S1, S2}) and the other
+        blocks are named with str, so that all the names have the same
+        type. Else the names of the states are kept.
+        """
+        if all(len(block) == 1 for block in blocks):
+            return [next(iter(block)) for block in blocks]
+        return [
+            str(next(iter(block))) if len(block) == 1
+            else Fsm._set_to_state(block)
+            for block in blocks
+        ]
+
     @property
     def states(self):
         """Returns the list of states."""
@@ -101,62 +133,577 @@ class Fsm(ABC):
         """Returns the accept states."""
         return self._final_states
 
-    def tabulate(self, tablefmt='grid'):
+    def canonical_hash(self):
         """
-        Returns the state-transition table formated with the
-        tabulate library.
+        Returns a structural hash of the machine.
 
-        - The initial state is indicated with an arrow: ->
-        - The accept states are indicated with a star: *
+        The reachable states are renumbered in breadth-first order from
+        the initial state, the symbols and the states reached with the
+        same symbol being sorted. The unreachable states are ignored, like
+        in to_dfa and minimize. Then the hash depends only on the
+        structure of the machine: two DFAs which are equal up to the names
+        of the states and their unreachable states have the same hash. For
+        NFAs, the names are used to sort the states reached with the same
+        symbol.
 
-        You can choose the table format with the tablefmt argument
-        (default: 'grid').
+        The result is cached until the machine is modified with its
+        methods.
+        """
+        if 'hash' in self._cache:
+            return self._cache['hash']
+        symbols = sorted(self._symbols, key=repr)
+        numbers = {self._initial_state: 0}
+        queue = [self._initial_state]
+        rows = []
+        for u in queue:
+            row = []
+            for symbol in symbols:
+                t = self.delta(u, symbol)
+                if self._is_deterministic:
+                    t = [] if t is None else [t]
+                for v in sorted(t, key=repr):
+                    if v not in numbers:
+                        numbers[v] = len(numbers)
+                        queue.append(v)
+                row.append(sorted(numbers[v] for v in t))
+            rows.append((u in self._final_states, row))
+        data = repr((
+            type(self).__name__, [repr(s) for s in symbols], rows
+        ))
+        self._cache['hash'] = hashlib.sha256(data.encode()).hexdigest()
+        self._cache['numbers'] = numbers
+        return self._cache['hash']
 
-        See: https://github.com/astanin/python-tabulate
+    def canonical_numbers(self):
         """
+        Returns the numbers of the reachable states used by
+        canonical_hash: a dictionnary state -> number. Two machines with
+        the same canonical hash are equal up to the names of the states
+        when the states with the same number are identified.
+        """
+        self.canonical_hash()
+        return self._cache['numbers']
 
-        # Create headers with symbols
-        headers = sorted(self._symbols)
-        # Create table and index
-        table, index = [], []
-        for state in sorted(self._states):
-            # Add line to table
-            if state in self._transitions:
-                line = []
-                for symbol in headers:
-                    if symbol in self._transitions[state]:
-                        line.append(str(self._transitions[state][symbol]))
-                    else:
-                        line.append('{}')
-                table.append(line)
-            else:
-                table.append(['{}'] * len(self._symbols))
+    def _is_epsilon(self, symbol):
+        """Returns True if the symbol is the one of epsilon-moves."""
+        return False
+
+    def stats(self):
+        """
+        Returns a dictionnary of statistics about the machine:
+        - states: number of states
+        - final_states: number of accept states
+        - symbols: size of the alphabet, without epsilon
+        - transitions: number of transitions, without epsilon-moves
+        - epsilon_transitions: number of epsilon-moves
+        - average_out_degree: average number of transitions (including
+          epsilon-moves) from a state
+        """
+        transitions = epsilon = 0
+        for u, row in self._transitions.items():
+            for symbol in row:
+                n = len(self._targets(u, symbol))
+                if self._is_epsilon(symbol):
+                    epsilon += n
+                else:
+                    transitions += n
+        return {
+            'states': len(self._states),
+            'final_states': len(self._final_states),
+            'symbols': sum(
+                1 for s in self._symbols if not self._is_epsilon(s)
+            ),
+            'transitions': transitions,
+            'epsilon_transitions': epsilon,
+            'average_out_degree': (transitions + epsilon) / len(self._states)
+        }
+
+    @staticmethod
+    def _sizeof(obj, seen):
+        """
+        Returns the size in bytes of an object and of all the objects it
+        contains (items of containers, attributes, globals of generated
+        functions), except the objects whose id is in the set seen.
+        The ids of the objects counted are added to seen. Classes, modules
+        and the builtins are never counted.
+        """
+        size = 0
+        seen.add(id(vars(builtins)))
+        stack = [obj]
+        while stack:
+            o = stack.pop()
+            if id(o) in seen or isinstance(o, (type, types.ModuleType)):
+                continue
+            seen.add(id(o))
+            size += sys.getsizeof(o)
+            if isinstance(o, dict):
+                stack.extend(o.keys())
+                stack.extend(o.values())
+            elif isinstance(o, (list, tuple, set, frozenset)):
+                stack.extend(o)
+            elif isinstance(o, types.FunctionType):
+                stack.append(o.__globals__)
+            elif hasattr(o, '__dict__'):
+                stack.append(vars(o))
+        return size
+
+    def memory_usage(self):
+        """
+        Returns a dictionnary with the memory used by the machine in bytes:
+        - states, symbols, transitions and final_states: the sizes of the
+          attributes, including the states and the symbols themselves
+        - cache: a dictionnary with the size of each cached result (the
+          compiled forms, the generated matcher...)
+        - other: the size of the other attributes (outputs, tags...)
+        - total: the size of the machine and of all the above
+
+        An object shared by several parts is counted once, in the first
+        part listed above.
+        """
+        seen = {id(self._cache)}
+        usage = dict()
+        for name in ['states', 'symbols', 'transitions', 'final_states']:
+            usage[name] = Fsm._sizeof(getattr(self, '_' + name), seen)
+        usage['cache'] = {
+            key: Fsm._sizeof(value, seen)
+            for key, value in sorted(
+                self._cache.items(), key=lambda item: repr(item[0])
+            )
+        }
+        usage['other'] = Fsm._sizeof(vars(self), seen)
+        usage['total'] = sys.getsizeof(self) + sys.getsizeof(self._cache) + \
+            sum(usage['cache'].values()) + sum(
+                v for k, v in usage.items() if k != 'cache'
+            )
+        return usage
+
+    def _update(self, change, *args):
+        """
+        Updates the cached results after a modification.
+
+        The cached objects which have an apply method (the compiled forms)
+        are updated incrementally if they support the change, the other
+        results are removed.
+        """
+        for key, value in list(self._cache.items()):
+            apply = getattr(value, 'apply', None)
+            if apply is None or not apply(self, change, *args):
+                del self._cache[key]
+
+    def _check_state(self, state):
+        """Raises an error if state is not a state."""
+        if state not in self._states:
+            raise FsmError('%s is not a state' % state)
+
+    def _check_symbol(self, symbol):
+        """Raises an error if symbol is not a symbol."""
+        if symbol not in self._symbols:
+            raise FsmError('%s is not a symbol' % symbol)
+
+    def add_state(self, state, final=False):
+        """Adds a new state without transitions."""
+        if state in self._states:
+            raise FsmError('%s is already a state' % state)
+        self._states.add(state)
+        if final:
+            self._final_states.add(state)
+        self._update('add_state', state, final)
+
+    def add_symbol(self, symbol):
+        """Adds a new symbol to the input alphabet."""
+        if symbol in self._symbols:
+            raise FsmError('%s is already a symbol' % symbol)
+        self._symbols.add(symbol)
+        self._update('add_symbol', symbol)
+
+    def set_final(self, state, final=True):
+        """Makes a state an accept state or not (final=False)."""
+        self._check_state(state)
+        if final:
+            self._final_states.add(state)
+        else:
+            self._final_states.discard(state)
+        self._update('set_final', state, final)
+
+    def add_transition(self, state, symbol, target):
+        """
+        Adds a transition from state to target with symbol.
+        For a DFA, it replaces the previous transition if there is one.
+
+        Only the new transition is validated and the compiled forms are
+        updated incrementally when possible.
+        """
+        self._check_state(state)
+        self._check_symbol(symbol)
+        self._check_state(target)
+        row = self._transitions.setdefault(state, dict())
+        if self._is_deterministic:
+            row[symbol] = target
+        else:
+            if not isinstance(row.get(symbol), set):
+                row[symbol] = set(row.get(symbol, ()))
+            row[symbol].add(target)
+        self._update('add_transition', state, symbol, target)
+
+    def remove_transition(self, state, symbol, target=None):
+        """
+        Removes the transition from state with symbol. For a NFA, you can
+        remove only the transition to target.
+        """
+        self._check_state(state)
+        self._check_symbol(symbol)
+        row = self._transitions.get(state, dict())
+        if symbol not in row:
+            raise FsmError('There is no transition from %s with %s' % (
+                state, symbol
+            ))
+        if target is None or self._is_deterministic:
+            del row[symbol]
+        else:
+            if target not in row[symbol]:
+                raise FsmError('There is no transition from %s to %s' % (
+                    state, target
+                ))
+            if not isinstance(row[symbol], set):
+                row[symbol] = set(row[symbol])
+            row[symbol].discard(target)
+            if not row[symbol]:
+                del row[symbol]
+        if not row:
+            self._transitions.pop(state, None)
+        self._update('remove_transition', state, symbol, target)
+
+    def _table_states(self, states=None, limit=None):
+        """
+        Returns the states shown in the state-transition table:
+        the given states or all the states sorted, limited to the first
+        limit states.
+        """
+        if states is None:
+            if limit is None:
+                return sorted(self._states)
+            return heapq.nsmallest(limit, self._states)
+        states = list(states)
+        for state in states:
+            self._check_state(state)
+        return states if limit is None else states[:limit]
 
-            # Add state to index
-            s = str(state)
+    def _state_label(self, state):
+        """Returns the label of a state in the table and the graph."""
+        return str(state)
+
+    def _edge_label(self, state, symbol):
+        """
+        Returns the label of the transition from a state with a symbol
+        in the graph.
+        """
+        return str(symbol)
+
+    def _cell(self, state, symbol):
+        """Returns the content of a cell of the state-transition table."""
+        if state in self._transitions and symbol in self._transitions[state]:
+            return str(self._transitions[state][symbol])
+        return '{}'
+
+    def table_rows(self, states=None, limit=None):
+        """
+        Yields the rows of the state-transition table one by one.
+
+        The first row contains the headers: an empty string then the
+        symbols. Each other row contains the state then its transitions.
+
+        - The initial state is indicated with an arrow: ->
+        - The accept states are indicated with a star: *
+
+        You can show only some states with the states argument, and
+        the first limit states with the limit argument.
+        """
+        headers = sorted(self._symbols)
+        yield [''] + [str(symbol) for symbol in headers]
+        for state in self._table_states(states, limit):
+            s = self._state_label(state)
             if state in self._final_states:
                 s = '* ' + s
             if state == self._initial_state:
                 s = '-> ' + s
-            index.append(s)
-
-        return tabulate(
-            table,
-            headers=headers,
-            tablefmt=tablefmt,
-            showindex=index,
-            stralign='right'
+            yield [s] + [self._cell(state, symbol) for symbol in headers]
+
+    def write_table(self, file=None, fmt='plain', states=None, limit=None):
+        """
+        Writes the state-transition table to a file row by row without
+        building the whole table in memory (default: sys.stdout).
+
+        The formats are:
+        - 'plain': cells separated by tabulations
+        - 'csv': comma-separated values
+        - 'markdown': table of the markdown syntax
+
+        The states and limit arguments are the same as for table_rows.
+        """
+        if file is None:
+            file = sys.stdout
+        rows = self.table_rows(states, limit)
+        if fmt == 'plain':
+            for row in rows:
+                file.write('\t'.join(row) + '\n')
+        elif fmt == 'csv':
+            csv.writer(file, lineterminator='\n').writerows(rows)
+        elif fmt == 'markdown':
+            headers = next(rows)
+            file.write('| ' + ' | '.join(headers) + ' |\n')
+            file.write('|' + '---|' * len(headers) + '\n')
+            for row in rows:
+                row = (cell.replace('|', '\\|') for cell in row)
+                file.write('| ' + ' | '.join(row) + ' |\n')
+        else:
+            raise FsmError('Unknown table format: %s' % fmt)
+
+    def tabulate(self, tablefmt='grid', states=None, limit=None):
+        """
+        Returns the state-transition table formated with the
+        tabulate library.
+
+        - The initial state is indicated with an arrow: ->
+        - The accept states are indicated with a star: *
+
+        You can choose the table format with the tablefmt argument
+        (default: 'grid'). The states and limit arguments are the same
+        as for table_rows.
+
+        The result is cached until the machine is modified with its
+        methods. For very large machines, use write_table instead.
+
+        See: https://github.com/astanin/python-tabulate
+        """
+        key = (
+            'tabulate',
+            tablefmt,
+            None if states is None else tuple(states),
+            limit
         )
+        if key not in self._cache:
+            rows = self.table_rows(key[2], limit)
+            headers = next(rows)[1:]
+            table, index = [], []
+            for row in rows:
+                index.append(row[0])
+                table.append(row[1:])
+            self._cache[key] = tabulate(
+                table,
+                headers=headers,
+                tablefmt=tablefmt,
+                showindex=index,
+                stralign='right'
+            )
+        return self._cache[key]
 
-    def print_table(self):
+    def print_table(self, states=None, limit=None):
         """
         Prints the state-transition table.
         It uses the tabulate library.
 
         - The initial state is indicated with an arrow: ->
         - The accept states are indicated with a star: *
+
+        The states and limit arguments are the same as for table_rows.
+        """
+        print(self.tabulate(states=states, limit=limit))
+
+    @staticmethod
+    def _names(values, what):
+        """
+        Returns a dictionnary str(value) -> value used to find states and
+        symbols from the keys of JSON objects.
+        """
+        names = dict()
+        for value in values:
+            if str(value) in names:
+                raise FsmError('Two %s have the same name: %s' % (what, value))
+            names[str(value)] = value
+        return names
+
+    @classmethod
+    def _json_class(cls, data):
+        """
+        Returns the class of a JSON object from its type. It must be cls
+        or a subclass of cls.
+        """
+        from fsmdot.dfa import Dfa
+        from fsmdot.nfa import Nfa
+        if not isinstance(data, dict):
+            raise FsmError('The JSON document must be an object')
+        for c in [Dfa, Nfa]:
+            if c._json_type == data.get('type') and issubclass(c, cls):
+                return c
+        raise FsmError('Unknown machine type: %s' % data.get('type'))
+
+    def _json_header(self):
+        """Returns the JSON object of a machine without transitions."""
+        if self._json_type is None:
+            raise FsmError(
+                '%s cannot be exported to JSON' % type(self).__name__
+            )
+        Fsm._names(self._states, 'states')
+        Fsm._names(self._symbols, 'symbols')
+        return {
+            'type': self._json_type,
+            'states': sorted(self._states, key=repr),
+            'symbols': sorted(self._symbols, key=repr),
+            'initial': self._initial_state,
+            'final': sorted(self._final_states, key=repr)
+        }
+
+    def _json_row(self, state):
+        """Returns the transitions of a state as a JSON object."""
+        return {
+            str(s): v if self._is_deterministic else sorted(v, key=repr)
+            for s, v in self._transitions.get(state, dict()).items()
+        }
+
+    def to_json(self, file=None):
+        """
+        Returns the machine as a JSON document, or writes it to a file.
+
+        The document is an object with the following keys:
+        - type: "dfa" or "nfa"
+        - states: list of states
+        - symbols: list of symbols
+        - initial: the initial state
+        - final: list of accept states
+        - transitions: object state -> object symbol -> state for a DFA,
+          or list of states for a NFA
+
+        The keys of JSON objects are strings: the states and the symbols
+        are found from their str representation, which must be unique.
+        """
+        data = self._json_header()
+        data['transitions'] = {
+            str(u): self._json_row(u) for u in sorted(
+                self._transitions, key=repr
+            )
+        }
+        if file is None:
+            return json.dumps(data, ensure_ascii=False)
+        json.dump(data, file, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, document):
+        """
+        Returns the machine of a JSON document (a string or a file).
+        See to_json for the format.
+        """
+        if isinstance(document, str):
+            data = json.loads(document)
+        else:
+            data = json.load(document)
+        cls = cls._json_class(data)
+        try:
+            fsm, states, symbols = cls._from_header(data)
+            transitions = data['transitions']
+            if not isinstance(transitions, dict):
+                raise FsmError('The transitions must be an object')
+            for u, row in transitions.items():
+                fsm._load_row(u, row, states, symbols)
+        except KeyError as e:
+            raise FsmError('The key %s is missing' % e)
+        except TypeError as e:
+            raise FsmError('Invalid machine: %s' % e)
+        return fsm
+
+    @classmethod
+    def _from_header(cls, data):
         """
-        print(self.tabulate())
+        Returns a machine without transitions from a JSON object, and the
+        dictionnaries to find its states and its symbols by name.
+        """
+        fsm = cls(
+            set(data['states']),
+            set(data['symbols']),
+            dict(),
+            data['initial'],
+            set(data['final'])
+        )
+        states = Fsm._names(fsm._states, 'states')
+        symbols = Fsm._names(fsm._symbols, 'symbols')
+        return fsm, states, symbols
+
+    def _load_row(self, state, row, states, symbols):
+        """
+        Validates the transitions of a state given as a JSON object and
+        adds them to the machine. states and symbols are the dictionnaries
+        returned by _from_header.
+        """
+        if state not in states:
+            raise FsmError('%s is not in the set of states' % state)
+        if not isinstance(row, dict):
+            raise FsmError(
+                'You must associate an object with the key %s' % state
+            )
+        state = states[state]
+        if state in self._transitions:
+            raise FsmError('The transitions of %s are given twice' % state)
+        transitions = self._transitions.setdefault(state, dict())
+        for symbol, t in row.items():
+            if symbol not in symbols:
+                raise FsmError('%s is not in the set of symbols' % symbol)
+            symbol = symbols[symbol]
+            if self._is_deterministic:
+                if isinstance(t, list) or t not in self._states:
+                    raise FsmError('%s is not in the set of states' % t)
+            else:
+                if not isinstance(t, list):
+                    raise FsmError('The transitions must be lists of states')
+                for v in t:
+                    if v not in self._states:
+                        raise FsmError('%s is not in the set of states' % v)
+                t = set(t)
+            transitions[symbol] = t
+
+    def to_ndjson(self, file):
+        """
+        Writes the machine to a file as newline-delimited JSON:
+        the first line is the object of to_json without the transitions,
+        then each line is an object {"state": state, "transitions": row}
+        where row is the object of the transitions of the state.
+        """
+        file.write(json.dumps(self._json_header(), ensure_ascii=False))
+        file.write('\n')
+        for u in sorted(self._transitions, key=repr):
+            file.write(json.dumps(
+                {'state': u, 'transitions': self._json_row(u)},
+                ensure_ascii=False
+            ))
+            file.write('\n')
+
+    @classmethod
+    def from_ndjson(cls, lines):
+        """
+        Returns the machine of newline-delimited JSON (an iterable of
+        lines, like a file). See to_ndjson for the format.
+
+        The lines are parsed one by one and the transitions are validated
+        and added to the machine directly, so the whole document is never
+        in memory.
+        """
+        fsm = None
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if fsm is None:
+                    fsm, states, symbols = \
+                        cls._json_class(data)._from_header(data)
+                else:
+                    fsm._load_row(
+                        str(data['state']), data['transitions'],
+                        states, symbols
+                    )
+            except (ValueError, KeyError, TypeError, FsmError) as e:
+                raise FsmError('Line %d: %s' % (number, e))
+        if fsm is None:
+            raise FsmError('The document is empty')
+        return fsm
 
     def delta(self, state, symbol):
         """
@@ -164,21 +711,115 @@ class Fsm(ABC):
         It returns the next state from a state and a symbol.
         It returns {} if there is no transition.
         """
-        if state not in self._states:
-            raise FsmError('%s is not a state' % state)
-        if symbol not in self._symbols:
-            raise FsmError('%s is not a symbol' % symbol)
+        self._check_state(state)
+        self._check_symbol(symbol)
         if state in self._transitions and symbol in self._transitions[state]:
             return self._transitions[state][symbol]
         return None if self._is_deterministic else {}
 
-    def dot_graph(self):
+    def _targets(self, state, symbol):
+        """Returns the list of states reached from a state with a symbol."""
+        t = self._transitions[state][symbol]
+        if isinstance(t, Iterable) and not isinstance(t, str):
+            return list(t)
+        return [t]
+
+    def _successors(self, state):
+        """Returns the set of states reached from a state."""
+        successors = set()
+        for symbol in self._transitions.get(state, ()):
+            successors.update(self._targets(state, symbol))
+        return successors
+
+    def neighbourhood(self, states, hops=1):
+        """
+        Returns the set of states at most hops transitions away from
+        the given states, following the transitions in both directions.
+        """
+        predecessors = dict()
+        for u in self._transitions:
+            for v in self._successors(u):
+                predecessors.setdefault(v, set()).add(u)
+        seen = set()
+        for state in states:
+            self._check_state(state)
+            seen.add(state)
+        frontier = set(seen)
+        for _ in range(hops):
+            new = set()
+            for u in frontier:
+                new.update(self._successors(u))
+                new.update(predecessors.get(u, ()))
+            frontier = new - seen
+            seen.update(frontier)
+        return seen
+
+    def strongly_connected_components(self, states=None):
+        """
+        Returns the list of the strongly connected components of the
+        graph of the machine (restricted to a set of states).
+        It uses Tarjan's algorithm.
+
+        See:
+        https://en.wikipedia.org/wiki/Tarjan%27s_strongly_connected_components_algorithm
+        """
+        if states is None:
+            states = self._states
+        index, low = dict(), dict()
+        stack, on_stack = [], set()
+        components = []
+        for root in states:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._successors(root)))]
+            while work:
+                u, successors = work[-1]
+                for v in successors:
+                    if v not in states:
+                        continue
+                    if v not in index:
+                        index[v] = low[v] = len(index)
+                        stack.append(v)
+                        on_stack.add(v)
+                        work.append((v, iter(self._successors(v))))
+                        break
+                    if v in on_stack:
+                        low[u] = min(low[u], index[v])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[u])
+                    if low[u] == index[u]:
+                        component = set()
+                        while True:
+                            v = stack.pop()
+                            on_stack.discard(v)
+                            component.add(v)
+                            if v == u:
+                                break
+                        components.append(component)
+        return components
+
+    def dot_graph(self, states=None, hops=1, collapse_scc=False,
+                  max_edges=None):
         """
         Returns the dot graph representing the automata.
 
         It uses the pygraphviz library. The method returns an AGraph.
         You can use the write method to write the dot graph to a file.
 
+        For large machines, you can export a smaller graph:
+        - states: only the states at most hops transitions away from
+          these states are shown (see neighbourhood)
+        - collapse_scc: each strongly connected component of several
+          states is shown as a single box labeled with its size
+        - max_edges: at most max_edges edges are shown, the number of
+          the other transitions is shown in a note
+
         See: https://pygraphviz.github.io/
         """
         # Init graph
@@ -188,31 +829,80 @@ class Fsm(ABC):
         G.graph_attr['rankdir'] = 'LR'
         G.node_attr['shape'] = 'circle'
 
-        # Init nodes
-        G.add_node('null', shape='point')
-        G.add_nodes_from(self._states)
+        # Selected states
+        if states is None:
+            nodes = self._states
+        else:
+            nodes = self.neighbourhood(states, hops)
+        node_of = dict()
+        if collapse_scc:
+            components = self.strongly_connected_components(nodes)
+            for i, component in enumerate(components):
+                if len(component) > 1:
+                    for state in component:
+                        node_of[state] = 'SCC %d' % i
+
+        # Init nodes, the point being shown only with the initial state
+        if self._initial_state in nodes:
+            G.add_node('null', shape='point')
+        G.add_nodes_from(s for s in nodes if s not in node_of)
+        if collapse_scc:
+            for i, component in enumerate(components):
+                if len(component) > 1:
+                    G.add_node(
+                        'SCC %d' % i,
+                        shape='box',
+                        style='rounded',
+                        label='SCC %d\n(%d states)' % (i, len(component)),
+                        peripheries=2 if component & self._final_states
+                        else 1
+                    )
 
         # Initial state
-        G.add_edge('null', self._initial_state)
+        if self._initial_state in nodes:
+            G.add_edge(
+                'null', node_of.get(self._initial_state, self._initial_state)
+            )
 
         # Final states
-        G.add_nodes_from(self._final_states, shape='doublecircle')
+        G.add_nodes_from(
+            (s for s in self._final_states if s in nodes and s not in node_of),
+            shape='doublecircle'
+        )
+
+        # Labels of states
+        for state in nodes:
+            label = self._state_label(state)
+            if label != str(state) and state not in node_of:
+                G.get_node(state).attr['label'] = label
 
         # Transitions
-        for u in self._transitions:
+        shown = hidden = 0
+        # The order of the edges matters when they are limited
+        for u in (self._transitions if states is None
+                  else sorted(nodes, key=repr)):
+            if u not in nodes or u not in self._transitions:
+                continue
+            a = node_of.get(u, u)
             for s in self._transitions[u]:
-                v = self._transitions[u][s]
-                if isinstance(v, Iterable) and not isinstance(v, str):
-                    for node in v:
-                        if G.has_edge(u, node):
-                            edge = G.get_edge(u, node)
-                            edge.attr['label'] += ', ' + str(s)
-                        else:
-                            G.add_edge(u, node, label=str(s))
-                else:
-                    if G.has_edge(u, v):
-                        edge = G.get_edge(u, v)
-                        edge.attr['label'] += ', ' + str(s)
+                for v in self._targets(u, s):
+                    if v not in nodes:
+                        continue
+                    b = node_of.get(v, v)
+                    if a == b and u in node_of:
+                        continue
+                    if G.has_edge(a, b):
+                        edge = G.get_edge(a, b)
+                        label = self._edge_label(u, s)
+                        if label not in edge.attr['label'].split(', '):
+                            edge.attr['label'] += ', ' + label
+                    elif max_edges is not None and shown >= max_edges:
+                        hidden += 1
                     else:
-                        G.add_edge(u, v, label=str(s))
+                        G.add_edge(a, b, label=self._edge_label(u, s))
+                        shown += 1
+        if hidden:
+            G.add_node(
+                'more', shape='note', label='%d more transitions' % hidden
+            )
         return G
@@ -0,0 +1,103 @@
+"""
+This module implements a longest-match tokenizer (lexer) built from
+several automatons.
+
+See: https://en.wikipedia.org/wiki/Maximal_munch
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from collections import namedtuple
+
+from fsmdot.multi import MultiDfa
+from fsmdot.error import FsmError
+
+Token = namedtuple('Token', ['kind', 'value', 'start', 'end'])
+Token.__doc__ = """
+Represents a token: its kind (the name of the rule), its value (the slice
+text[start:end] of the input) and its position.
+"""
+
+
+class Lexer:
+    """
+    Represents a longest-match tokenizer.
+
+    - rules is a list of pairs (kind, machine) where machine is a DFA or
+      a NFA accepting the tokens of this kind
+    - skip is a set of kinds of tokens which are not yielded (spaces,
+      comments...)
+
+    The rules are combined in a single MultiDfa. At each position, the
+    longest token is chosen, and the first rule of the list if several
+    rules accept it. Empty tokens are never produced.
+    """
+    def __init__(self, rules, skip=()):
+        rules = list(rules)
+        self._kinds = [kind for kind, _ in rules]
+        self._skip = set(skip)
+        self._dfa = MultiDfa.from_patterns(machine for _, machine in rules)
+
+    @property
+    def dfa(self):
+        """Returns the MultiDfa of the rules."""
+        return self._dfa
+
+    def _byte_index(self, compiled):
+        """
+        Returns the list of the numbers of the symbols of the 256 bytes:
+        a byte b is the symbol b, or the symbol chr(b).
+        """
+        index = compiled.symbol_index
+        return [index.get(b, index.get(chr(b))) for b in range(256)]
+
+    def tokenize(self, text, start=0):
+        """
+        Yields the tokens of a text (str, bytes, bytearray or mmap) from
+        the index start.
+
+        The compiled table is run from the start of each token while
+        remembering the last accept position, then the token ends at this
+        position. The pairs (state, position) from which no accept state
+        can be reached are memorized, so that the text is read in linear
+        time even when long prefixes are rejected (Reps' algorithm).
+
+        Raises an error if no rule accepts a non-empty prefix at some
+        position.
+
+        See: https://doi.org/10.1145/276393.276394
+        """
+        compiled = self._dfa.compile()
+        table, m = compiled.table, len(compiled.symbols)
+        tags = [self._dfa.tags.get(s, 0) for s in compiled.states]
+        if isinstance(text, str):
+            index = compiled.symbol_index.get
+        else:
+            index = self._byte_index(compiled).__getitem__
+        n = len(text)
+        failed = set()
+        pos = start
+        while pos < n:
+            state, i = compiled.initial, pos
+            last, tag = pos, 0
+            visited = []
+            while i < n:
+                j = index(text[i])
+                if j is None:
+                    break
+                state = table[state * m + j]
+                i += 1
+                if state < 0 or (state, i) in failed:
+                    break
+                if tags[state]:
+                    last, tag = i, tags[state]
+                    visited.clear()
+                else:
+                    visited.append((state, i))
+            failed.update(visited)
+            if not tag:
+                raise FsmError('No token at position %d' % pos)
+            kind = self._kinds[(tag & -tag).bit_length() - 1]
+            if kind not in self._skip:
+                yield Token(kind, text[pos:last], pos, last)
+            pos = last
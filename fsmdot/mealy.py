@@ -0,0 +1,83 @@
+"""
+This module implements Mealy machines.
+
+See: https://en.wikipedia.org/wiki/Mealy_machine
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from fsmdot.transducer import Transducer
+from fsmdot.error import FsmError
+
+
+class Mealy(Transducer):
+    """
+    Represents a Mealy machine: a finite-state transducer whose outputs
+    are determined by the current state and the input symbol.
+
+    - Q is a set of states
+    - S is a set of input symbols (alphabet)
+    - d is a dictionnary containing the transitions: d[state][symbol]
+      is a pair (next state, output)
+    - q0 is the initial state
+
+    See: https://en.wikipedia.org/wiki/Mealy_machine
+    """
+    def __init__(self, Q, S, d, q0):
+        if not isinstance(d, dict):
+            raise FsmError('The transitions must be a dictionnay')
+        transitions, self._outputs = dict(), dict()
+        for state, row in d.items():
+            if not isinstance(row, dict):
+                raise FsmError(
+                    'You must associate a dictionnary with the key %s' % state
+                )
+            transitions[state], self._outputs[state] = dict(), dict()
+            for symbol, t in row.items():
+                if not isinstance(t, (tuple, list)) or len(t) != 2:
+                    raise FsmError(
+                        'The transition from %s with %s must be a pair '
+                        '(next state, output)' % (state, symbol)
+                    )
+                transitions[state][symbol] = t[0]
+                self._outputs[state][symbol] = t[1]
+        super().__init__(Q, S, transitions, q0)
+
+    @property
+    def outputs(self):
+        """Returns the outputs: outputs[state][symbol] is an output."""
+        return self._outputs
+
+    def output(self, state, symbol):
+        """Returns the output of the transition from a state with a symbol."""
+        self._check_state(state)
+        self._check_symbol(symbol)
+        return self._outputs.get(state, dict()).get(symbol)
+
+    def first_output(self):
+        """Returns the output written before reading the input: None."""
+        return None
+
+    def add_transition(self, state, symbol, target, output=None):
+        """Adds a transition from state to target with symbol and output."""
+        self._check_state(state)
+        self._check_symbol(symbol)
+        self._check_state(target)
+        self._outputs.setdefault(state, dict())[symbol] = output
+        super().add_transition(state, symbol, target)
+
+    def remove_transition(self, state, symbol, target=None):
+        """Removes the transition from state with symbol."""
+        super().remove_transition(state, symbol, target)
+        del self._outputs[state][symbol]
+
+    def _cell(self, state, symbol):
+        if state in self._transitions and symbol in self._transitions[state]:
+            return '%s/%s' % (
+                self._transitions[state][symbol],
+                self._outputs[state][symbol]
+            )
+        return '{}'
+
+    def _edge_label(self, state, symbol):
+        return '%s/%s' % (symbol, self._outputs[state][symbol])
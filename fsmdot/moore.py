@@ -0,0 +1,65 @@
+"""
+This module implements Moore machines.
+
+See: https://en.wikipedia.org/wiki/Moore_machine
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from fsmdot.transducer import Transducer
+from fsmdot.error import FsmError
+
+
+class Moore(Transducer):
+    """
+    Represents a Moore machine: a finite-state transducer whose outputs
+    are determined only by the current state.
+
+    - Q is a set of states
+    - S is a set of input symbols (alphabet)
+    - d is a dictionnary containing the transitions
+    - q0 is the initial state
+    - outputs is a dictionnary containing the output of each state
+
+    The output of the initial state is written before reading the input,
+    then the output of each state reached.
+
+    See: https://en.wikipedia.org/wiki/Moore_machine
+    """
+    def __init__(self, Q, S, d, q0, outputs):
+        super().__init__(Q, S, d, q0)
+        if not isinstance(outputs, dict):
+            raise FsmError('The outputs must be a dictionnay')
+        for state in outputs:
+            self._check_state(state)
+        self._outputs = outputs
+
+    @property
+    def outputs(self):
+        """Returns the outputs: outputs[state] is an output."""
+        return self._outputs
+
+    def output(self, state, symbol):
+        """
+        Returns the output written by the transition from a state with
+        a symbol: the output of the next state.
+        """
+        return self._outputs.get(self.delta(state, symbol))
+
+    def first_output(self):
+        """Returns the output of the initial state."""
+        return self._outputs.get(self._initial_state)
+
+    def add_state(self, state, output=None):
+        """Adds a new state with an output and without transitions."""
+        super().add_state(state)
+        self._outputs[state] = output
+
+    def set_output(self, state, output):
+        """Changes the output of a state."""
+        self._check_state(state)
+        self._outputs[state] = output
+        self._update('set_output', state, output)
+
+    def _state_label(self, state):
+        return '%s/%s' % (state, self._outputs.get(state))
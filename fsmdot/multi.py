@@ -0,0 +1,147 @@
+"""
+This module implements multi-pattern automatons: a single DFA which
+matches a string against several patterns at once.
+
+See: https://en.wikipedia.org/wiki/Powerset_construction
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.error import FsmError
+
+
+class MultiDfa(Dfa):
+    """
+    Represents a DFA whose states are tagged with the patterns which
+    accept there.
+
+    - Q is a set of states
+    - S is a set of input symbols (alphabet)
+    - d is a dictionnary containing the transitions
+    - q0 is the initial state
+    - tags is a dictionnary containing the tag of each state: the bit i
+      of the tag is 1 if the pattern i accepts in this state
+
+    The accept states are the states with a non-zero tag. Use from_patterns
+    to build it from a list of DFAs and NFAs.
+    """
+    _json_type = None
+
+    def __init__(self, Q, S, d, q0, tags):
+        if not isinstance(tags, dict):
+            raise FsmError('The tags must be a dictionnary')
+        super().__init__(Q, S, d, q0, {s for s, t in tags.items() if t})
+        for state in tags:
+            self._check_state(state)
+        self._tags = tags
+
+    @classmethod
+    def from_patterns(cls, patterns):
+        """
+        Returns the multi-pattern DFA of a list of DFAs and NFAs: the
+        pattern i is the i-th element of the list.
+
+        It uses a tagged powerset construction on the union of the
+        patterns: a state is a set of pairs (i, state of the pattern i),
+        and its tag is the set of the patterns having an accept state in
+        it. The states of the result are integers numbered in
+        breadth-first order and the initial state is 0.
+        """
+        patterns = list(patterns)
+
+        def closure(i, state):
+            p = patterns[i]
+            if isinstance(p, Nfa):
+                return {(i, s) for s in p.epsilon_closure(state)}
+            return {(i, state)}
+
+        symbols = set()
+        for p in patterns:
+            symbols.update(p.symbols)
+        symbols.discard(Nfa.EPSILON)
+        symbols = sorted(symbols, key=repr)
+
+        initial = set()
+        for i, p in enumerate(patterns):
+            initial.update(closure(i, p.initial_state))
+        initial = frozenset(initial)
+        index = {initial: 0}
+        queue = [initial]
+        transitions = dict()
+        tags = dict()
+        for u in queue:
+            n = index[u]
+            tag = 0
+            for i, s in u:
+                if s in patterns[i].final_states:
+                    tag |= 1 << i
+            tags[n] = tag
+            row = dict()
+            for symbol in symbols:
+                t = set()
+                for i, s in u:
+                    if symbol in patterns[i].transitions.get(s, ()):
+                        for v in patterns[i]._targets(s, symbol):
+                            t.update(closure(i, v))
+                if t:
+                    t = frozenset(t)
+                    if t not in index:
+                        index[t] = len(index)
+                        queue.append(t)
+                    row[symbol] = index[t]
+            if row:
+                transitions[n] = row
+        return cls(set(index.values()), set(symbols), transitions, 0, tags)
+
+    @property
+    def tags(self):
+        """Returns the tags: tags[state] is a bitmask of patterns."""
+        return self._tags
+
+    def add_state(self, state, tag=0):
+        """Adds a new state with a tag and without transitions."""
+        super().add_state(state, bool(tag))
+        self._tags[state] = tag
+
+    def set_tag(self, state, tag):
+        """Changes the tag of a state."""
+        self.set_final(state, bool(tag))
+        self._tags[state] = tag
+        self._update('set_tag', state, tag)
+
+    def match_mask(self, string):
+        """
+        Returns the bitmask of the patterns which accept the string.
+
+        It reads the string once with the compiled DFA, so the cost does
+        not depend on the number of patterns.
+        """
+        compiled = self.compile()
+        if 'tags' not in self._cache:
+            self._cache['tags'] = [
+                self._tags.get(s, 0) for s in compiled.states
+            ]
+        state = compiled.run(string)
+        return self._cache['tags'][state] if state >= 0 else 0
+
+    @staticmethod
+    def _ids(mask):
+        """Returns the set of the numbers of the patterns of a bitmask."""
+        ids = set()
+        while mask:
+            low = mask & -mask
+            ids.add(low.bit_length() - 1)
+            mask ^= low
+        return ids
+
+    def match(self, string):
+        """Returns the set of the numbers of the patterns which accept."""
+        return MultiDfa._ids(self.match_mask(string))
+
+    def _state_label(self, state):
+        ids = MultiDfa._ids(self._tags.get(state, 0))
+        if not ids:
+            return str(state)
+        return '%s/%s' % (state, ','.join(str(i) for i in sorted(ids)))
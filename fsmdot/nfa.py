@@ -6,8 +6,14 @@ See: https://en.wikipedia.org/wiki/Nondeterministic_finite_automaton
 Author: Quentin Deschamps
 Date: 2020
 """
+from array import array
+
 from fsmdot.fsm import Fsm
 from fsmdot.dfa import Dfa
+from fsmdot.compiled import CompiledNfa
+from fsmdot.antichain import is_universal, is_subset
+from fsmdot.error import FsmError, StateLimitError
+from fsmdot.disk import DiskDfa, _create, _finalize
 
 
 class Nfa(Fsm):
@@ -25,6 +31,7 @@ class Nfa(Fsm):
     See: https://en.wikipedia.org/wiki/Nondeterministic_finite_automaton
     """
     EPSILON = chr(949)
+    _json_type = 'nfa'
 
     def __init__(self, Q, S, d, q0, F):
         super().__init__(Q, S, d, q0, F, False)
@@ -45,43 +52,96 @@ class Nfa(Fsm):
             current_states = new_states
         return bool(current_states.intersection(self._final_states))
 
+    def _is_epsilon(self, symbol):
+        return symbol == Nfa.EPSILON
+
     def epsilon_closure(self, state):
         """Returns the epsilon closure of a state."""
         c = {state}
         if self.has_epsilon_moves():
-            self._recursive_closure(state, c)
+            stack = [state]
+            while stack:
+                for s in self.delta(stack.pop(), Nfa.EPSILON):
+                    if s not in c:
+                        c.add(s)
+                        stack.append(s)
         return c
 
-    def _recursive_closure(self, state, c):
-        c.add(state)
-        for s in self.delta(state, Nfa.EPSILON):
-            self._recursive_closure(s, c)
-
-    @staticmethod
-    def _set_to_state(s):
-        """Transforms a set of states to a new state."""
-        return '{' + ', '.join(sorted(str(i) for i in s)) + '}'
+    def compile(self):
+        """
+        Returns the NFA compiled for a bit-parallel simulation
+        (CompiledNfa). The result is cached until the NFA is modified
+        with its methods.
+        """
+        if 'compiled' not in self._cache:
+            self._cache['compiled'] = CompiledNfa(self)
+        return self._cache['compiled']
 
-    def to_dfa(self):
+    def to_dfa(self, cache=None, max_states=None):
         """
         Returns the DFA corresponding to the NFA.
 
         It uses the powerset construction.
 
+        You can give a Cache with the cache argument to store the result
+        on disk and reuse it for machines with the same canonical hash.
+
+        If max_states is given, the construction stops as soon as the DFA
+        has more than max_states states and a StateLimitError is raised.
+
         See: https://en.wikipedia.org/wiki/Powerset_construction
         """
+        if cache is not None:
+            dfa = cache.get('to_dfa', self, Nfa._subset_names)
+            if dfa is not None:
+                if max_states is not None and len(dfa.states) > max_states:
+                    raise StateLimitError(
+                        'The DFA has more than %d states' % max_states
+                    )
+                return dfa
+
+        members = None if cache is None else dict()
+        dfa = self._powerset(max_states, members=members)
+        if dfa is None:
+            raise StateLimitError(
+                'The DFA has more than %d states' % max_states
+            )
+        if cache is not None:
+            cache.put('to_dfa', self, dfa, members)
+        return dfa
+
+    @staticmethod
+    def _subset_names(subsets):
+        """Returns the names of the states of the powerset construction."""
+        return [Nfa._set_to_state(s) for s in subsets]
+
+    def _powerset(self, max_states=None, initial=None, members=None):
+        """
+        Powerset construction used by to_dfa, starting from the set of
+        states initial (default: the epsilon closure of the initial state).
+        Returns None if the DFA has more than max_states states.
+        If members is a dictionnary, the set of states of each state of
+        the DFA is added to it.
+        """
         symbols = set(self._symbols)
         if self.has_epsilon_moves():
             symbols.remove(Nfa.EPSILON)
         states = set()
         transitions = dict()
         final_states = set()
-        new_states = [self.epsilon_closure(self._initial_state)]
+        if initial is None:
+            initial = self.epsilon_closure(self._initial_state)
+        new_states = [initial]
         initial_state = Nfa._set_to_state(new_states[0])
         while new_states:
+            if max_states is not None and \
+                    len(states) + len(new_states) > max_states:
+                return None
             state = new_states.pop()
             new_state = Nfa._set_to_state(state)
             states.add(new_state)
+            if members is not None:
+                members[new_state] = state
             if self._final_states.intersection(state):
                 final_states.add(new_state)
             transitions[new_state] = dict()
@@ -97,3 +157,294 @@ class Nfa(Fsm):
                         new_states.append(t)
 
         return Dfa(states, symbols, transitions, initial_state, final_states)
+
+    @staticmethod
+    def _reverse(fsm):
+        """Returns the reverse of a DFA or a NFA (see Nfa.reverse)."""
+        transitions = dict()
+        for u in fsm.transitions:
+            for symbol in fsm.transitions[u]:
+                for v in fsm._targets(u, symbol):
+                    transitions.setdefault(v, dict()).setdefault(
+                        symbol, set()
+                    ).add(u)
+        states = set(fsm.states)
+        symbols = set(fsm.symbols)
+        if len(fsm.final_states) == 1:
+            initial_state, = fsm.final_states
+        else:
+            if all(type(s) is int for s in states):
+                initial_state = max(states) + 1
+            else:
+                initial_state = 'init'
+                while initial_state in states:
+                    initial_state += "'"
+            states.add(initial_state)
+            symbols.add(Nfa.EPSILON)
+            transitions[initial_state] = {Nfa.EPSILON: set(fsm.final_states)}
+        return Nfa(
+            states, symbols, transitions, initial_state, {fsm.initial_state}
+        )
+
+    def reverse(self):
+        """
+        Returns the NFA accepting the reverse of the strings accepted by
+        the NFA.
+
+        The transitions are reversed and the initial state becomes the
+        accept state. If there are several accept states, a new initial
+        state has epsilon-moves to all of them: the greatest state plus 1
+        if the states are integers, else the string init.
+
+        See: https://en.wikipedia.org/wiki/Regular_language#Closure_properties
+        """
+        return Nfa._reverse(self)
+
+    @staticmethod
+    def _reverse_powerset(fsm, max_states=None):
+        """
+        Returns the powerset construction of the reverse of a DFA or a NFA,
+        or None if it has more than max_states states.
+
+        It starts from the union of the epsilon closures of the accept
+        states instead of the new initial state of Nfa.reverse, so that
+        this state never belongs to the subsets.
+        """
+        reverse = Nfa._reverse(fsm)
+        initial = set()
+        for state in fsm.final_states:
+            initial.update(reverse.epsilon_closure(state))
+        return reverse._powerset(max_states, initial)
+
+    def minimal_dfa(self, method='auto'):
+        """
+        Returns the minimal DFA corresponding to the NFA. Its states are
+        numbered in breadth-first order (see Dfa.renumber).
+
+        The methods are:
+        - 'hopcroft': powerset construction then Dfa.minimize
+        - 'brzozowski': powerset construction of the reverse, twice,
+          which never builds the non-minimal DFA
+        - 'auto': the powerset constructions of the NFA and of its reverse
+          are run with a limit of states multiplied by 4 until one of
+          them succeeds, then the corresponding method is completed.
+
+        See:
+        https://en.wikipedia.org/wiki/DFA_minimization#Brzozowski's_algorithm
+        """
+        if method == 'hopcroft':
+            return self.to_dfa().minimize().renumber()
+        if method == 'brzozowski':
+            dfa = Nfa._reverse_powerset(self)
+            return Nfa._reverse_powerset(dfa).renumber()
+        if method != 'auto':
+            raise FsmError('Unknown method: %s' % method)
+        limit = 4 * len(self._states)
+        while True:
+            dfa = self._powerset(limit)
+            if dfa is not None:
+                return dfa.minimize().renumber()
+            dfa = Nfa._reverse_powerset(self, limit)
+            if dfa is not None:
+                return Nfa._reverse_powerset(dfa).renumber()
+            limit *= 4
+
+    @staticmethod
+    def _bisimulation(edges, blocks):
+        """
+        Returns the coarsest stable partition refining an initial one,
+        by partition refinement: edges[i] is the list of the pairs
+        (symbol, k) of the transitions from the state i, and blocks[i] is
+        the number of the block of the state i. Two states stay in the
+        same block if, for each symbol, they reach the same blocks.
+        """
+        count = len(set(blocks))
+        while True:
+            signatures = dict()
+            new = [
+                signatures.setdefault((blocks[i], frozenset(
+                    (symbol, blocks[k]) for symbol, k in edges[i]
+                )), len(signatures))
+                for i in range(len(edges))
+            ]
+            if len(signatures) == count:
+                return new
+            blocks, count = new, len(signatures)
+
+    def reduce(self):
+        """
+        Returns a NFA accepting the same strings with fewer states.
+
+        The states which are not reachable from the initial state, or from
+        which no accept state is reachable, are removed. Then the states
+        equivalent for the forward bisimulation (same futures) are merged,
+        then the ones equivalent for the backward bisimulation (same
+        pasts). The epsilon-moves are handled like the other symbols.
+        A merged state is named like the states of the powerset
+        construction: {S1, S2}, and then the other states are named with
+        str.
+
+        See: https://en.wikipedia.org/wiki/Bisimulation
+        """
+        states = sorted(self._states, key=repr)
+        index = {s: i for i, s in enumerate(states)}
+        edges = [[] for _ in states]
+        inverse = [[] for _ in states]
+        for u, row in self._transitions.items():
+            for symbol, t in row.items():
+                for v in t:
+                    edges[index[u]].append((symbol, index[v]))
+                    inverse[index[v]].append((symbol, index[u]))
+
+        # Useful states
+        def explore(start, graph):
+            seen = set(start)
+            stack = list(start)
+            while stack:
+                for _, k in graph[stack.pop()]:
+                    if k not in seen:
+                        seen.add(k)
+                        stack.append(k)
+            return seen
+
+        initial = index[self._initial_state]
+        final = {index[s] for s in self._final_states}
+        useful = explore([initial], edges) & explore(final, inverse)
+        if initial not in useful:
+            q0 = self._initial_state
+            return Nfa({q0}, set(self._symbols), dict(), q0, set())
+        useful = sorted(useful)
+        number = {i: k for k, i in enumerate(useful)}
+        edges = [
+            [(s, number[k]) for s, k in edges[i] if k in number]
+            for i in useful
+        ]
+
+        # Forward bisimulation, then backward bisimulation of the quotient
+        forward = Nfa._bisimulation(edges, [i in final for i in useful])
+        quotient = [set() for _ in range(max(forward) + 1)]
+        for i, row in enumerate(edges):
+            for symbol, k in row:
+                quotient[forward[k]].add((symbol, forward[i]))
+        backward = Nfa._bisimulation(
+            [list(row) for row in quotient],
+            [b == forward[number[initial]] for b in range(len(quotient))]
+        )
+
+        # Build the reduced NFA
+        members = dict()
+        for k, i in enumerate(useful):
+            members.setdefault(backward[forward[k]], set()).add(states[i])
+        classes = list(members)
+        names = dict(zip(classes, Nfa._block_names(
+            [members[c] for c in classes]
+        )))
+        transitions = dict()
+        for k, row in enumerate(edges):
+            u = names[backward[forward[k]]]
+            for symbol, j in row:
+                transitions.setdefault(u, dict()).setdefault(
+                    symbol, set()
+                ).add(names[backward[forward[j]]])
+        return Nfa(
+            set(names.values()),
+            set(self._symbols),
+            transitions,
+            names[backward[forward[number[initial]]]],
+            {names[backward[forward[number[i]]]] for i in final & set(useful)}
+        )
+
+    def is_universal(self):
+        """
+        Returns True if the NFA accepts all the strings over its alphabet.
+
+        It uses an antichain of sets of states with simulation subsumption
+        (see fsmdot.antichain), so the DFA is never built.
+        """
+        return is_universal(self)
+
+    def is_subset_of(self, other):
+        """
+        Returns True if the strings accepted by the NFA are all accepted
+        by other (a DFA or a NFA).
+
+        It uses an antichain of pairs (state of the NFA, set of states of
+        other) with simulation subsumption (see fsmdot.antichain), so the
+        DFAs are never built.
+        """
+        return is_subset(self, other)
+
+    def to_disk_dfa(self, path, commit_every=10000):
+        """
+        Returns the DFA corresponding to the NFA stored on disk.
+
+        It uses the powerset construction like to_dfa, but the subsets
+        already seen and the transitions are stored in a SQLite database
+        instead of memory. The result is written to path and returned as
+        a DiskDfa.
+
+        The database is committed every commit_every new states.
+        """
+        symbols = set(self._symbols)
+        if self.has_epsilon_moves():
+            symbols.remove(Nfa.EPSILON)
+        symbols = sorted(symbols, key=repr)
+        states = sorted(self._states, key=repr)
+        index = {s: i for i, s in enumerate(states)}
+
+        conn = _create(path)
+        conn.execute(
+            'CREATE TABLE subsets (id INTEGER PRIMARY KEY, key BLOB UNIQUE)'
+        )
+
+        def encode(subset):
+            return array('I', sorted(index[s] for s in subset)).tobytes()
+
+        def decode(key):
+            a = array('I')
+            a.frombytes(key)
+            return {states[i] for i in a}
+
+        conn.execute(
+            'INSERT INTO subsets VALUES (0, ?)',
+            (encode(self.epsilon_closure(self._initial_state)),)
+        )
+        count, current = 1, 0
+        while current < count:
+            key, = conn.execute(
+                'SELECT key FROM subsets WHERE id = ?', (current,)
+            ).fetchone()
+            state = decode(key)
+            conn.execute(
+                'INSERT INTO states VALUES (?, ?, ?)', (
+                    current,
+                    repr(Nfa._set_to_state(state)),
+                    bool(self._final_states.intersection(state))
+                )
+            )
+            rows = []
+            for i, symbol in enumerate(symbols):
+                t = set()
+                for s in state:
+                    for j in self.delta(s, symbol):
+                        t.update(self.epsilon_closure(j))
+                if t:
+                    key = encode(t)
+                    row = conn.execute(
+                        'SELECT id FROM subsets WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is None:
+                        conn.execute(
+                            'INSERT INTO subsets VALUES (?, ?)', (count, key)
+                        )
+                        row = (count,)
+                        count += 1
+                    rows.append((current, i, row[0]))
+            conn.executemany('INSERT INTO transitions VALUES (?, ?, ?)', rows)
+            current += 1
+            if current % commit_every == 0:
+                conn.commit()
+
+        conn.execute('DROP TABLE subsets')
+        _finalize(conn, symbols, 0)
+        return DiskDfa(path)
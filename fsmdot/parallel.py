@@ -0,0 +1,102 @@
+"""
+This module implements the matching of strings with a DFA on several
+processes.
+
+The transition table of the compiled DFA is copied once in a block of
+shared memory. The worker processes read it from there, so neither the
+DFA nor the table is sent with the tasks: only the strings and the
+results are.
+
+See: https://docs.python.org/3/library/multiprocessing.shared_memory.html
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+import os
+from itertools import islice
+from multiprocessing import Pool
+
+from fsmdot.error import FsmError
+
+_worker = None
+
+
+def _init_worker(name, size, n, m, initial, symbol_index):
+    """
+    Attaches a worker process to the shared memory block name of a
+    compiled DFA with n states, m symbols and size bytes of table.
+    """
+    global _worker
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name)
+    table = shm.buf[:size].cast('l')
+    final = shm.buf[size:size + n]
+    _worker = (shm, table, final, m, initial, symbol_index)
+
+
+def _accept_chunk(strings):
+    """Returns the list of the results of the strings of a chunk."""
+    _, table, final, m, initial, symbol_index = _worker
+    results = []
+    for string in strings:
+        state = initial
+        for symbol in string:
+            j = symbol_index.get(symbol)
+            if j is None:
+                raise FsmError('%s is not a symbol' % symbol)
+            state = table[state * m + j]
+            if state < 0:
+                break
+        results.append(state >= 0 and final[state] == 1)
+    return results
+
+
+def _chunks(iterable, chunk_size):
+    """Yields the elements of an iterable by lists of chunk_size."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def accept_parallel(dfa, iterable, workers=None, chunk_size=1000):
+    """
+    Yields the results of DFA.accept for the strings of an iterable, in
+    order, computed by workers processes (default: the number of CPUs).
+    The strings are sent to the processes by chunks of chunk_size.
+
+    Raises an error if a string contains a symbol not in the alphabet.
+
+    Several processes require Python 3.8 (multiprocessing.shared_memory).
+    """
+    compiled = dfa.compile()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for string in iterable:
+            yield compiled.accept(string)
+        return
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise FsmError('accept_parallel requires Python 3.8 or newer')
+    table = compiled.table.tobytes()
+    size = len(table)
+    n = len(compiled.states)
+    shm = shared_memory.SharedMemory(create=True, size=max(size + n, 1))
+    try:
+        shm.buf[:size] = table
+        shm.buf[size:size + n] = compiled.final
+        with Pool(workers, _init_worker, (
+            shm.name, size, n, len(compiled.symbols),
+            compiled.initial, compiled.symbol_index
+        )) as pool:
+            for results in pool.imap(
+                _accept_chunk, _chunks(iterable, chunk_size)
+            ):
+                yield from results
+    finally:
+        shm.close()
+        shm.unlink()
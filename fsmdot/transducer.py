@@ -0,0 +1,72 @@
+"""
+This module implements finite-state transducers.
+
+See: https://en.wikipedia.org/wiki/Finite-state_transducer
+
+Author: Quentin Deschamps
+Date: 2020
+"""
+from abc import abstractmethod
+
+from fsmdot.fsm import Fsm
+from fsmdot.compiled import CompiledTransducer
+
+
+class Transducer(Fsm):
+    """
+    Represents a deterministic finite-state transducer: a machine which
+    writes an output for each input symbol.
+
+    The subclasses define the outputs with the output and first_output
+    methods.
+
+    See: https://en.wikipedia.org/wiki/Finite-state_transducer
+    """
+    def __init__(self, Q, S, d, q0):
+        super().__init__(Q, S, d, q0, set(), True)
+
+    @abstractmethod
+    def output(self, state, symbol):
+        """Returns the output of the transition from a state with a symbol."""
+        pass
+
+    @abstractmethod
+    def first_output(self):
+        """
+        Returns the output written before reading the input, or None if
+        there is no such output.
+        """
+        pass
+
+    def compile(self):
+        """
+        Returns the machine compiled in a transition table
+        (CompiledTransducer). The result is cached until the machine is
+        modified with its methods.
+        """
+        if 'compiled' not in self._cache:
+            self._cache['compiled'] = CompiledTransducer(self)
+        return self._cache['compiled']
+
+    def transduce(self, string, out=None):
+        """
+        Returns the list of outputs produced by reading the string.
+
+        If out is given, the outputs are written in this preallocated
+        buffer (a list, a bytearray...) and the number of outputs written
+        is returned.
+
+        Raises an error if a transition is missing.
+        """
+        return self.compile().transduce(string, out)[0]
+
+    def transduce_chunks(self, chunks):
+        """
+        Reads an iterable of strings as a single input and yields the list
+        of outputs produced by each string.
+        """
+        t = self.compile()
+        state = None
+        for chunk in chunks:
+            outputs, state = t.transduce(chunk, state=state)
+            yield outputs
@@ -22,6 +22,9 @@ setuptools.setup(
     author_email='quentindeschamps18@gmail.com',
     url='https://github.com/Quentin18/fsmdot',
     packages=['fsmdot'],
+    entry_points={
+        'console_scripts': ['fsmdot=fsmdot.cli:main'],
+    },
     classifiers=[
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
@@ -46,5 +49,5 @@ setuptools.setup(
     install_requires=['pygraphviz', 'tabulate'],
     python_requires='>=3.6',
     setup_requires=['pytest-runner'],
-    tests_require='pytest'
+    tests_require=['pytest', 'hypothesis']
 )
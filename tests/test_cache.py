@@ -0,0 +1,78 @@
+"""
+Tests for the Cache class.
+"""
+import os
+import pytest
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.cache import Cache
+
+
+@pytest.fixture
+def a1():
+    Q = {'X', '0', '1', '2'}
+    S = {'0', '1'}
+    d = {
+        'X': {
+            '0': {'X'},
+            '1': {'X', '0'}
+        },
+        '0': {
+            '0': {'1'},
+            '1': {'1'}
+        },
+        '1': {
+            '0': {'2'},
+            '1': {'2'}
+        }
+    }
+    q0 = 'X'
+    F = {'2'}
+    return Nfa(Q, S, d, q0, F)
+
+
+def test_to_dfa(a1, tmp_path):
+    cache = Cache(str(tmp_path))
+    dfa = a1.to_dfa(cache=cache)
+    assert cache.size() > 0
+    assert cache.get('to_dfa', a1, Nfa._subset_names).transitions == \
+        dfa.transitions
+    assert a1.to_dfa(cache=cache).transitions == a1.to_dfa().transitions
+    m = dfa.minimize(cache=cache)
+    assert cache.get('minimize', dfa).states == m.states
+    assert cache.get('minimize', m).states == dfa.states
+
+
+def test_eviction(a1, tmp_path):
+    cache = Cache(str(tmp_path))
+    dfa = a1.to_dfa(cache=cache)
+    size = cache.size()
+    os.utime(os.path.join(str(tmp_path), os.listdir(str(tmp_path))[0]),
+             (0, 0))
+    cache = Cache(str(tmp_path), max_size=size)
+    dfa.minimize(cache=cache)
+    assert cache.get('to_dfa', a1) is None
+    assert cache.get('minimize', dfa) is not None
+    cache.clear()
+    assert cache.size() == 0
+    assert isinstance(dfa, Dfa)
+
+
+def test_names(a1, tmp_path):
+    """A cached result is renamed for the machine which reads it."""
+    cache = Cache(str(tmp_path))
+    d = {'p': {'a': {'q'}}}
+    Nfa({'p', 'q'}, {'a'}, d, 'p', {'q'}).to_dfa(cache=cache)
+    d = {'x': {'a': {'y'}}}
+    xy = Nfa({'x', 'y'}, {'a'}, d, 'x', {'y'})
+    dfa = xy.to_dfa(cache=cache)
+    assert dfa.states == xy.to_dfa().states == {'{x}', '{y}'}
+    assert dfa.delta('{x}', 'a') == '{y}'
+
+    d = {0: {'a': 1}, 1: {'a': 2}, 2: {'a': 2}}
+    Dfa({0, 1, 2}, {'a'}, d, 0, {1, 2}).minimize(cache=cache)
+    d = {'A': {'a': 'B'}, 'B': {'a': 'C'}, 'C': {'a': 'C'}}
+    abc = Dfa({'A', 'B', 'C'}, {'a'}, d, 'A', {'B', 'C'})
+    m = abc.minimize(cache=cache)
+    assert m.states == abc.minimize().states == {'A', '{B, C}'}
+    assert m.transitions == abc.minimize().transitions
@@ -0,0 +1,84 @@
+"""
+Tests for the command-line interface.
+"""
+import json
+import pytest
+from fsmdot.cli import main
+from fsmdot.disk import DiskDfa
+
+
+@pytest.fixture
+def nfa(tmp_path):
+    path = str(tmp_path / 'nfa.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'type': 'nfa',
+            'states': [1, 2, 3, 4],
+            'symbols': ['ε', '0', '1'],
+            'transitions': {
+                '1': {'ε': [3], '0': [2]},
+                '2': {'1': [2, 4]},
+                '3': {'ε': [2], '0': [4]},
+                '4': {'0': [3]}
+            },
+            'initial': 1,
+            'final': [3, 4]
+        }, f)
+    return path
+
+
+@pytest.fixture
+def words(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    with open(path, 'w') as f:
+        f.write('011101100\n0001\n00\n00011\n2\n' * 10)
+    return path
+
+
+def test_to_dfa(nfa, tmp_path, capsys):
+    assert main(['to-dfa', nfa]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data['type'] == 'dfa'
+    assert len(data['states']) == 4
+    assert data['initial'] == '{1, 2, 3}'
+
+    path = str(tmp_path / 'dfa.db')
+    assert main(['minimize', nfa, '-o', path]) == 0
+    with DiskDfa(path) as disk:
+        assert disk.accept('011101100')
+
+
+def test_dot_table(nfa, capsys):
+    assert main(['dot', nfa]) == 0
+    assert capsys.readouterr().out.startswith('strict digraph FSM {')
+    assert main(['table', nfa, '--format', 'csv', '--limit', '1']) == 0
+    assert capsys.readouterr().out == ',0,1,ε\n-> 1,{2},{},{3}\n'
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_match(nfa, words, jobs, capsys):
+    assert main(['match', nfa, words, '--jobs', jobs, '--stats',
+                 '--chunk-size', '3']) == 0
+    out, err = capsys.readouterr()
+    assert out == '011101100\n00\n' * 10
+    assert err.startswith('lines: 50, selected: 20,')
+    assert main(['match', nfa, words, '-j', jobs, '-v', '-c']) == 0
+    assert capsys.readouterr().out == '30\n'
+
+
+def test_errors(nfa, tmp_path, capsys):
+    assert main(['table', str(tmp_path / 'missing.db')]) == 1
+    assert capsys.readouterr().err.startswith('fsmdot:')
+    assert main(['match', str(tmp_path / 'missing.db'), nfa,
+                 '--jobs', '2']) == 1
+    assert capsys.readouterr().err.startswith('fsmdot:')
+    assert main(['to-dfa', nfa, '--max-states', '3']) == 1
+    assert 'more than 3 states' in capsys.readouterr().err
+
+
+def test_ndjson(nfa, tmp_path, capsys):
+    path = str(tmp_path / 'dfa.ndjson')
+    assert main(['to-dfa', nfa, '-o', path]) == 0
+    assert main(['table', path, '-f', 'plain', '-n', '1']) == 0
+    out = capsys.readouterr().out
+    assert out == '\t0\t1\n-> * {1, 2, 3}\t{2, 4}\t{2, 4}\n'
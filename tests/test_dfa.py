@@ -4,8 +4,12 @@ Tests for the Dfa class.
 Automatons are inspired by Wikipedia:
 https://en.wikipedia.org/wiki/Deterministic_finite_automaton
 """
+import sys
+import random
+import importlib
 import pytest
 from fsmdot.dfa import Dfa
+from fsmdot.error import FsmError
 
 
 @pytest.fixture
@@ -78,3 +82,131 @@ def test_accept(a1, a2):
 def test_unreachable_states(a1, a2):
     assert not a1.unreachable_states()
     assert not a2.unreachable_states()
+
+
+def test_from_words():
+    words = ['tap', 'taps', 'top', 'tops']
+    a = Dfa.from_words(words)
+    assert len(a.states) == 5
+    for word in words:
+        assert a.accept(word)
+    for word in ['', 't', 'ta', 'tapss', 'tos']:
+        assert not a.accept(word)
+
+    a = Dfa.from_words(['', 'a', 'aa', 'aa', 'b'])
+    assert a.accept('')
+    assert a.accept('b')
+    assert not a.accept('ab')
+    assert len(a.states) == 3
+
+    with pytest.raises(FsmError):
+        Dfa.from_words(['b', 'a'])
+
+
+def test_compile(a1, a2):
+    t = a2.compile()
+    assert a2.compile() is t
+    for string in ['1001', '10101', '11100010100', '101', '1110', '']:
+        assert t.accept(string) == a2.accept(string)
+    with pytest.raises(FsmError):
+        t.accept('2')
+
+
+def test_compile_to_python(a2, tmp_path, monkeypatch):
+    strings = ['1001', '10101', '11100010100', '101', '1110', '']
+    accept = a2.compile_to_python()
+    assert a2.compile_to_python() is accept
+    for string in strings:
+        assert accept(string) == a2.accept(string)
+    with pytest.raises(FsmError):
+        accept('2')
+    a2.add_state('S3')
+    a2.add_transition('S3', '0', 'S0')
+    a2.remove_transition('S2', '1')
+    a2.add_transition('S2', '1', 'S3')
+    accept = a2.compile_to_python(tmp_path / 'matcher.py')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module('matcher')
+    for string in strings + ['110110', '11010']:
+        assert accept(string) == a2.accept(string)
+        assert module.accept(string) == a2.accept(string)
+    sys.modules.pop('matcher')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_accept_parallel(a2, workers):
+    if workers > 1 and sys.version_info < (3, 8):
+        pytest.skip('shared memory requires Python 3.8')
+    strings = [format(i, 'b') for i in range(200)] + ['']
+    results = a2.accept_parallel(strings, workers=workers, chunk_size=16)
+    assert list(results) == [a2.accept(string) for string in strings]
+    results = a2.accept_parallel(iter(strings), workers=workers)
+    assert next(results) == a2.accept('0')
+    results.close()
+    with pytest.raises(FsmError):
+        list(a2.accept_parallel(['01', '2'], workers=workers))
+
+
+def test_count(a1, a2):
+    assert a1.count(0) == 1
+    assert a1.count(3) == 1 + 1 + 2 + 4
+    accepted = [
+        s for s in ['', '0', '1', '00', '01', '10', '11'] if a2.accept(s)
+    ]
+    assert a2.count(2) == len(accepted)
+
+
+def test_shortest(a1, a2):
+    assert a1.shortest() == ''
+    assert Dfa.from_words(['abc', 'ba', 'bb']).shortest() == 'ba'
+    a = Dfa({0, 1}, {'a'}, {}, 0, {1})
+    assert a.shortest() is None
+
+
+def test_enumerate(a2):
+    assert list(a2.enumerate(4)) == [
+        '', '0', '00', '11', '000', '011', '110',
+        '0000', '0011', '0110', '1001', '1100', '1111'
+    ]
+    assert list(Dfa.from_words(['a', 'b']).enumerate(0)) == []
+
+
+def test_sample(a2):
+    words = a2.sample(20, 6, random.Random(0))
+    assert len(words) == 20
+    for word in words:
+        assert len(word) == 6
+        assert a2.accept(word)
+    with pytest.raises(FsmError):
+        Dfa.from_words(['a']).sample(1, 2)
+
+
+def test_minimize(a1, a2):
+    assert len(a1.minimize().states) == 2
+    assert len(a2.minimize().states) == 3
+
+    # S2 and S3 are equivalent, S4 is unreachable, S5 is a dead state
+    Q = {'S0', 'S1', 'S2', 'S3', 'S4', 'S5'}
+    S = {'a', 'b'}
+    d = {
+        'S0': {'a': 'S1', 'b': 'S5'},
+        'S1': {'a': 'S2', 'b': 'S3'},
+        'S2': {'a': 'S2', 'b': 'S3'},
+        'S3': {'a': 'S2', 'b': 'S3'},
+        'S4': {'a': 'S0'},
+        'S5': {'a': 'S5', 'b': 'S5'}
+    }
+    a = Dfa(Q, S, d, 'S0', {'S2', 'S3'})
+    m = a.minimize()
+    assert m.states == {'S0', 'S1', '{S2, S3}'}
+    assert m.transitions['S0'] == {'a': 'S1'}
+    for string in ['', 'a', 'aa', 'ab', 'abba', 'b', 'bab', 'aabab']:
+        assert m.accept(string) == a.accept(string)
+
+    empty = Dfa({0, 1}, {'a'}, {0: {'a': 1}}, 0, set())
+    assert empty.minimize().states == {0}
+
+    d = {0: {'a': 1}, 1: {'a': 2}, 2: {'a': 2}}
+    m = Dfa({0, 1, 2}, {'a'}, d, 0, {1, 2}).minimize()
+    assert m.states == {'0', '{1, 2}'}
+    assert m.tabulate().count('\n') == 6
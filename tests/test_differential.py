@@ -0,0 +1,263 @@
+"""
+Differential tests: all the engines must give the same results as the
+reference methods Dfa.accept and Nfa.accept.
+
+The automatons and the strings are generated with Hypothesis:
+https://hypothesis.readthedocs.io/
+
+Run with pytest -s to see the timing ratios between the engines.
+"""
+import io
+import os
+import time
+import tempfile
+import pytest
+from hypothesis import given, settings, strategies as st
+from fsmdot.fsm import Fsm
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.multi import MultiDfa
+from fsmdot.lexer import Lexer
+from fsmdot.disk import DiskDfa, write_dfa
+from fsmdot.error import FsmError
+
+SYMBOLS = ['a', 'b']
+
+# 'c' is never in the alphabet
+strings = st.lists(
+    st.text(alphabet='aaabbbc', max_size=8), min_size=1, max_size=20
+)
+
+
+@st.composite
+def nfas(draw, max_states=6):
+    """Random NFAs with epsilon-moves (and cycles) and partial transitions."""
+    n = draw(st.integers(1, max_states))
+    states = list(range(n))
+    symbols = SYMBOLS + ([Nfa.EPSILON] if draw(st.booleans()) else [])
+    d = dict()
+    for u in states:
+        for s in symbols:
+            targets = draw(st.sets(st.sampled_from(states), max_size=2))
+            if targets:
+                d.setdefault(u, dict())[s] = targets
+    F = draw(st.sets(st.sampled_from(states)))
+    return Nfa(set(states), set(symbols), d, 0, F)
+
+
+@st.composite
+def dfas(draw, max_states=6):
+    """Random DFAs with partial transitions."""
+    n = draw(st.integers(1, max_states))
+    states = ['S%d' % i for i in range(n)]
+    d = dict()
+    for u in states:
+        for s in SYMBOLS:
+            v = draw(st.one_of(st.none(), st.sampled_from(states)))
+            if v is not None:
+                d.setdefault(u, dict())[s] = v
+    F = draw(st.sets(st.sampled_from(states)))
+    return Dfa(set(states), set(SYMBOLS), d, 'S0', F)
+
+
+def accepts(accept, string):
+    """Calls an accept method: an unknown symbol rejects the string."""
+    try:
+        return accept(string)
+    except FsmError:
+        return False
+
+
+def check(reference, engines, strings):
+    """Checks that all the engines give the results of the reference."""
+    for string in strings:
+        expected = accepts(reference, string)
+        for name, accept in engines.items():
+            assert accepts(accept, string) == expected, (name, string)
+
+
+def nfa_engines(a):
+    """Returns the accept functions of the engines built from a NFA."""
+    compiled = a.compile()
+    plain = Nfa(a.states, a.symbols, a.transitions, 0, a.final_states)
+    plain.compile().tables = None
+    dfa = a.to_dfa()
+    return {
+        'compiled': compiled.accept,
+        'compiled without byte tables': plain.compile().accept,
+        'to_dfa': dfa.accept,
+        'to_dfa compiled': dfa.compile().accept,
+        'to_dfa python': dfa.compile_to_python(),
+        'minimize': dfa.minimize().accept,
+        'minimal_dfa hopcroft': a.minimal_dfa('hopcroft').accept,
+        'minimal_dfa brzozowski': a.minimal_dfa('brzozowski').accept,
+        'reverse twice': a.reverse().reverse().accept,
+        'reduce': a.reduce().accept,
+        'reduce to_dfa': a.reduce().to_dfa().accept,
+        'json': Fsm.from_json(a.to_json()).accept,
+    }
+
+
+def dfa_engines(a):
+    """Returns the accept functions of the engines built from a DFA."""
+    f = io.StringIO()
+    a.to_ndjson(f)
+    return {
+        'compiled': a.compile().accept,
+        'python': a.compile_to_python(),
+        'minimize': a.minimize().accept,
+        'renumber': a.renumber().accept,
+        'reverse twice': a.reverse().reverse().accept,
+        'json': Fsm.from_json(a.to_json()).accept,
+        'ndjson': Fsm.from_ndjson(f.getvalue().splitlines()).accept,
+    }
+
+
+@settings(max_examples=100, deadline=None)
+@given(nfas(), strings)
+def test_nfa_engines(a, strings):
+    check(a.accept, nfa_engines(a), strings)
+
+
+@settings(max_examples=100, deadline=None)
+@given(dfas(), strings)
+def test_dfa_engines(a, strings):
+    check(a.accept, dfa_engines(a), strings)
+
+
+@settings(max_examples=100, deadline=None)
+@given(nfas())
+def test_minimal_sizes(a):
+    dfas = [a.minimal_dfa(m) for m in ['auto', 'hopcroft', 'brzozowski']]
+    assert len({len(dfa.states) for dfa in dfas}) == 1
+    assert len(dfas[0].minimize().states) == len(dfas[0].states)
+    assert a.to_dfa().minimize().canonical_hash() == \
+        dfas[0].minimize().canonical_hash()
+    r = a.reduce()
+    assert len(r.states) <= len(a.states)
+    assert len(r.reduce().states) <= len(r.states)
+    assert r.minimal_dfa().canonical_hash() == dfas[0].canonical_hash()
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.lists(st.one_of(nfas(), dfas()), min_size=1, max_size=4), strings)
+def test_multi_dfa(patterns, strings):
+    m = MultiDfa.from_patterns(patterns)
+    for string in strings:
+        expected = {
+            i for i, p in enumerate(patterns) if accepts(p.accept, string)
+        }
+        if all(symbol in m.symbols for symbol in string):
+            assert m.match(string) == expected, string
+        else:
+            assert not expected
+
+
+def longest_match(patterns, text):
+    """Tokenizes a text by testing all the prefixes (quadratic)."""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        best = None
+        for end in range(pos + 1, len(text) + 1):
+            for i, p in enumerate(patterns):
+                if accepts(p.accept, text[pos:end]):
+                    best = (i, text[pos:end], pos, end)
+                    break
+        if best is None:
+            return tokens, pos
+        tokens.append(best)
+        pos = best[3]
+    return tokens, None
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.lists(st.one_of(nfas(), dfas()), min_size=1, max_size=3),
+       st.text(alphabet='aaabbbc', max_size=20))
+def test_lexer(patterns, text):
+    tokens, error = longest_match(patterns, text)
+    lexer = Lexer(enumerate(patterns))
+    result = []
+    try:
+        for token in lexer.tokenize(text):
+            result.append(tuple(token))
+    except FsmError:
+        assert result == tokens and error is not None
+    else:
+        assert result == tokens and error is None
+
+
+def is_universal(a):
+    """Returns True if the minimal DFA is a single accept state with loops."""
+    dfa = a.minimal_dfa()
+    q = dfa.initial_state
+    return len(dfa.states) == 1 and q in dfa.final_states and all(
+        dfa.delta(q, s) is not None for s in dfa.symbols
+    )
+
+
+def union(machines, symbols):
+    """Returns the minimal DFA of the union of machines over symbols."""
+    u = Nfa({'init'}, set(symbols) | {Nfa.EPSILON}, dict(), 'init', set())
+    for k, machine in enumerate(machines):
+        for q in machine.states:
+            u.add_state((k, q), q in machine.final_states)
+        for q, row in machine.transitions.items():
+            for symbol in row:
+                for v in machine._targets(q, symbol):
+                    u.add_transition((k, q), symbol, (k, v))
+        u.add_transition('init', Nfa.EPSILON, (k, machine.initial_state))
+    return u.minimal_dfa()
+
+
+@settings(max_examples=100, deadline=None)
+@given(nfas(), st.one_of(nfas(), dfas()))
+def test_antichains(a, b):
+    assert a.is_universal() == is_universal(a)
+    # L(a) is included in L(b) iff L(b) is the union of L(a) and L(b)
+    symbols = a.symbols | b.symbols
+    assert a.is_subset_of(b) == (
+        union([a, b], symbols).canonical_hash() ==
+        union([b], symbols).canonical_hash()
+    )
+
+
+@settings(max_examples=30, deadline=None)
+@given(nfas(), strings)
+def test_disk_engines(a, strings):
+    with tempfile.TemporaryDirectory() as directory:
+        with a.to_disk_dfa(os.path.join(directory, 'a.db')) as disk:
+            check(a.accept, {'to_disk_dfa': disk.accept}, strings)
+        path = os.path.join(directory, 'b.db')
+        write_dfa(a.minimal_dfa(), path)
+        with DiskDfa(path) as disk:
+            check(a.accept, {'write_dfa': disk.accept}, strings)
+
+
+@pytest.fixture
+def blowup():
+    """The n-th symbol from the end is a 1: the DFA has 2^n states."""
+    n = 6
+    Q = set(range(n + 1))
+    d = {0: {'0': {0}, '1': {0, 1}}}
+    for i in range(1, n):
+        d[i] = {'0': {i + 1}, '1': {i + 1}}
+    return Nfa(Q, {'0', '1'}, d, 0, {n})
+
+
+def test_timing_ratios(blowup, record_property):
+    inputs = [format(i * 2654435761 % 2**20, '020b') for i in range(500)]
+
+    def measure(accept):
+        start = time.perf_counter()
+        results = [accept(string) for string in inputs]
+        return time.perf_counter() - start, results
+
+    reference, expected = measure(blowup.accept)
+    print('\nreference Nfa.accept: %.4f s' % reference)
+    for name, accept in nfa_engines(blowup).items():
+        elapsed, results = measure(accept)
+        assert results == expected, name
+        ratio = reference / elapsed if elapsed else float('inf')
+        record_property(name, ratio)
+        print('%s: %.4f s (x%.1f)' % (name, elapsed, ratio))
@@ -0,0 +1,86 @@
+"""
+Tests for the DiskDfa class.
+"""
+import pytest
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.disk import DiskDfa, write_dfa
+from fsmdot.error import FsmError
+
+
+@pytest.fixture
+def a1():
+    Q = {1, 2, 3, 4}
+    S = {Nfa.EPSILON, '0', '1'}
+    d = {
+        1: {
+            Nfa.EPSILON: {3},
+            '0': {2}
+        },
+        2: {
+            '1': {2, 4}
+        },
+        3: {
+            Nfa.EPSILON: {2},
+            '0': {4}
+        },
+        4: {
+            '0': {3}
+        }
+    }
+    q0 = 1
+    F = {3, 4}
+    return Nfa(Q, S, d, q0, F)
+
+
+@pytest.fixture
+def a2():
+    Q = {'S0', 'S1', 'S2'}
+    S = {'0', '1'}
+    d = {
+        'S0': {
+            '0': 'S0',
+            '1': 'S1'
+        },
+        'S1': {
+            '0': 'S2',
+            '1': 'S0'
+        },
+        'S2': {
+            '0': 'S1',
+            '1': 'S2'
+        }
+    }
+    q0 = 'S0'
+    F = {'S0'}
+    return Dfa(Q, S, d, q0, F)
+
+
+def test_to_disk_dfa(a1, tmp_path):
+    dfa = a1.to_dfa()
+    with a1.to_disk_dfa(str(tmp_path / 'a1.db')) as disk:
+        assert len(disk) == 4
+        assert disk.symbols == {'0', '1'}
+        assert disk.name(disk.initial_state) == '{1, 2, 3}'
+        for string in ['', '0', '011101100', '00', '0100', '111']:
+            assert disk.accept(string) == dfa.accept(string)
+        loaded = disk.to_dfa()
+    assert loaded.states == dfa.states
+    assert loaded.final_states == dfa.final_states
+    assert loaded.transitions == dfa.transitions
+
+
+def test_write_dfa(a2, tmp_path):
+    path = str(tmp_path / 'a2.db')
+    write_dfa(a2, path)
+    with DiskDfa(path) as disk:
+        assert disk.accept('1001')
+        assert not disk.accept('101')
+        with pytest.raises(FsmError):
+            disk.accept('2')
+        assert disk.to_dfa().transitions == a2.transitions
+
+
+def test_invalid_file(tmp_path):
+    with pytest.raises(FsmError):
+        DiskDfa(str(tmp_path / 'missing.db'))
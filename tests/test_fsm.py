@@ -0,0 +1,302 @@
+"""
+Tests for the methods of the Fsm class.
+"""
+import io
+import sys
+import subprocess
+import pytest
+from fsmdot.fsm import Fsm
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.error import FsmError
+
+
+@pytest.fixture
+def a1():
+    Q = {'S1', 'S2'}
+    S = {'0', '1'}
+    d = {
+        'S1': {
+            '0': 'S2',
+            '1': 'S1'
+        },
+        'S2': {
+            '0': 'S1',
+            '1': 'S2'
+        }
+    }
+    q0 = 'S1'
+    F = {'S1'}
+    return Dfa(Q, S, d, q0, F)
+
+
+@pytest.fixture
+def a2():
+    Q = {1, 2, 3, 4}
+    S = {Nfa.EPSILON, '0', '1'}
+    d = {
+        1: {
+            Nfa.EPSILON: {3},
+            '0': {2}
+        },
+        2: {
+            '1': {2, 4}
+        },
+        3: {
+            Nfa.EPSILON: {2},
+            '0': {4}
+        },
+        4: {
+            '0': {3}
+        }
+    }
+    q0 = 1
+    F = {3, 4}
+    return Nfa(Q, S, d, q0, F)
+
+
+def test_table_rows(a1, a2):
+    assert list(a1.table_rows()) == [
+        ['', '0', '1'],
+        ['-> * S1', 'S2', 'S1'],
+        ['S2', 'S1', 'S2']
+    ]
+    assert list(a2.table_rows(limit=2)) == [
+        ['', '0', '1', Nfa.EPSILON],
+        ['-> 1', '{2}', '{}', '{3}'],
+        ['2', '{}', '{2, 4}', '{}']
+    ]
+    assert list(a2.table_rows(states=[4]))[1:] == [
+        ['* 4', '{3}', '{}', '{}']
+    ]
+    with pytest.raises(FsmError):
+        list(a2.table_rows(states=[5]))
+
+
+def test_write_table(a1):
+    f = io.StringIO()
+    a1.write_table(f)
+    assert f.getvalue() == '\t0\t1\n-> * S1\tS2\tS1\nS2\tS1\tS2\n'
+
+    f = io.StringIO()
+    a1.write_table(f, fmt='csv', limit=1)
+    assert f.getvalue() == ',0,1\n-> * S1,S2,S1\n'
+
+    f = io.StringIO()
+    a1.write_table(f, fmt='markdown', states=['S2'])
+    assert f.getvalue() == '|  | 0 | 1 |\n|---|---|---|\n| S2 | S1 | S2 |\n'
+
+    with pytest.raises(FsmError):
+        a1.write_table(f, fmt='html')
+
+
+def test_tabulate(a1):
+    table = a1.tabulate()
+    assert a1.tabulate() is table
+    assert '-> * S1' in table
+    assert len(a1.tabulate(limit=1).splitlines()) == 5
+
+
+def test_stats(a1, a2):
+    assert a1.stats() == {
+        'states': 2,
+        'final_states': 1,
+        'symbols': 2,
+        'transitions': 4,
+        'epsilon_transitions': 0,
+        'average_out_degree': 2.0
+    }
+    stats = a2.stats()
+    assert stats['symbols'] == 2
+    assert stats['transitions'] == 5
+    assert stats['epsilon_transitions'] == 2
+    assert stats['average_out_degree'] == 7 / 4
+
+
+def test_memory_usage(a2):
+    usage = a2.memory_usage()
+    assert usage['cache'] == dict()
+    assert usage['transitions'] > usage['final_states'] > 0
+    a2.compile()
+    compiled = a2.memory_usage()
+    assert compiled['cache']['compiled'] > 0
+    assert compiled['total'] >= usage['total'] + compiled['cache']['compiled']
+    a2.tabulate()
+    assert len(a2.memory_usage()['cache']) == 2
+    a2.add_transition(4, Nfa.EPSILON, 1)
+    assert a2.memory_usage()['cache'] == dict()
+
+
+def test_canonical_hash(a1, a2):
+    Q = {0, 1}
+    S = {'0', '1'}
+    d = {
+        0: {
+            '0': 1,
+            '1': 0
+        },
+        1: {
+            '0': 0,
+            '1': 1
+        }
+    }
+    b1 = Dfa(Q, S, d, 0, {0})
+    assert b1.canonical_hash() == a1.canonical_hash()
+    b2 = Dfa(Q, S, d, 0, {1})
+    assert b2.canonical_hash() != a1.canonical_hash()
+    assert a2.canonical_hash() == a2.canonical_hash()
+    assert a2.canonical_hash() != a2.to_dfa().canonical_hash()
+    # The unreachable states are ignored
+    c1 = Dfa({0, 'x', 'y'}, {'a'}, {0: {'a': 0}, 'x': {'a': 'y'}}, 0, {0})
+    c2 = Dfa({0, 'x', 'y'}, {'a'}, {0: {'a': 0}, 'y': {'a': 'x'}}, 0, {0})
+    c3 = Dfa({0}, {'a'}, {0: {'a': 0}}, 0, {0})
+    assert c1.canonical_hash() == c2.canonical_hash() == c3.canonical_hash()
+    assert c1.canonical_numbers() == {0: 0}
+
+
+def test_mutations_dfa(a1):
+    t = a1.compile()
+    table = a1.tabulate()
+    a1.add_state('S3')
+    assert a1.unreachable_states() == {'S3'}
+    a1.add_transition('S2', '1', 'S3')
+    assert not a1.unreachable_states()
+    a1.set_final('S3')
+    assert a1.compile() is t
+    assert a1.tabulate() != table
+    assert a1.accept('01')
+    assert t.accept('01')
+    a1.remove_transition('S2', '1')
+    assert a1.unreachable_states() == {'S3'}
+    assert not t.accept('01')
+    a1.add_symbol('2')
+    assert a1.compile() is not t
+    assert a1.delta('S1', '2') is None
+
+    with pytest.raises(FsmError):
+        a1.add_state('S1')
+    with pytest.raises(FsmError):
+        a1.add_transition('S1', '3', 'S2')
+    with pytest.raises(FsmError):
+        a1.add_transition('S1', '0', 'S4')
+    with pytest.raises(FsmError):
+        a1.remove_transition('S3', '0')
+
+
+def test_mutations_nfa(a2):
+    t = a2.compile()
+    for i in range(5, 12):
+        a2.add_state(i)
+        a2.add_transition(i - 1, '1', i)
+    a2.set_final(4, False)
+    a2.set_final(11)
+    assert a2.compile() is t
+    a2.remove_transition(2, '1', 4)
+    a2.remove_transition(10, '1')
+    assert a2.compile() is t
+    strings = ['', '0', '01', '0111', '00', '1111111', '01111111']
+    for string in strings:
+        assert t.accept(string) == a2.accept(string)
+    a2.add_transition(4, Nfa.EPSILON, 1)
+    assert a2.compile() is not t
+    for string in strings:
+        assert a2.compile().accept(string) == a2.accept(string)
+
+    with pytest.raises(FsmError):
+        a2.remove_transition(2, '1', 3)
+
+
+@pytest.fixture
+def a3():
+    """A cycle of 10 states with a tail of 10 states."""
+    Q = set(range(20))
+    S = {'a', 'b'}
+    d = {i: {'a': {(i + 1) % 10}} for i in range(10)}
+    for i in range(10, 19):
+        d[i] = {'b': {i + 1}}
+    d[9]['b'] = {10}
+    return Nfa(Q, S, d, 0, {19})
+
+
+def test_neighbourhood(a3):
+    assert a3.neighbourhood([0]) == {9, 0, 1}
+    assert a3.neighbourhood([10], hops=2) == {8, 9, 10, 11, 12, 0}
+    with pytest.raises(FsmError):
+        a3.neighbourhood([20])
+
+
+def test_strongly_connected_components(a3):
+    components = a3.strongly_connected_components()
+    assert len(components) == 11
+    assert set(range(10)) in components
+    assert len(a3.strongly_connected_components(set(range(10, 20)))) == 10
+
+
+def test_dot_graph(a3):
+    G = a3.dot_graph()
+    assert G.number_of_nodes() == 21
+    assert G.number_of_edges() == 21
+
+    G = a3.dot_graph(states=[15], hops=2)
+    assert set(G.nodes()) == {'13', '14', '15', '16', '17'}
+    assert G.number_of_edges() == 4
+    G = a3.dot_graph(states=[15], hops=2, max_edges=2)
+    assert set(G.edges()) == {('13', '14'), ('14', '15')}
+    assert G.get_node('more').attr['label'] == '2 more transitions'
+    assert a3.dot_graph(states=[0]).has_edge('null', '0')
+
+    G = a3.dot_graph(collapse_scc=True)
+    assert G.number_of_nodes() == 12
+    assert G.has_edge('null', 'SCC 10')
+    assert G.has_edge('SCC 10', '10')
+    assert G.get_node('SCC 10').attr['label'] == 'SCC 10\n(10 states)'
+
+    G = a3.dot_graph(max_edges=5)
+    assert G.number_of_edges() == 6
+    assert G.get_node('more').attr['label'] == '15 more transitions'
+
+
+def test_json(a1, a2):
+    for a in [a1, a2]:
+        b = Fsm.from_json(a.to_json())
+        assert type(b) is type(a)
+        assert b.states == a.states
+        assert b.symbols == a.symbols
+        assert b.transitions == a.transitions
+        assert b.initial_state == a.initial_state
+        assert b.final_states == a.final_states
+    f = io.StringIO()
+    a2.to_json(f)
+    f.seek(0)
+    assert Nfa.from_json(f).transitions == a2.transitions
+    with pytest.raises(FsmError):
+        Dfa.from_json(a2.to_json())
+    with pytest.raises(FsmError):
+        Fsm.from_json('{"type": "dfa", "states": ["S1"]}')
+    with pytest.raises(FsmError):
+        Fsm.from_json(a1.to_json().replace('"S2"}', '"S3"}'))
+    # The classes are found without importing their modules first
+    code = 'from fsmdot.fsm import Fsm; print(type(Fsm.from_json(%r)))'
+    out = subprocess.check_output(
+        [sys.executable, '-c', code % a1.to_json()], universal_newlines=True
+    )
+    assert out == "<class 'fsmdot.dfa.Dfa'>\n"
+
+
+def test_ndjson(a2):
+    f = io.StringIO()
+    a2.to_ndjson(f)
+    lines = f.getvalue().splitlines()
+    assert len(lines) == 5
+    b = Fsm.from_ndjson(lines)
+    assert b.transitions == a2.transitions
+    assert b.final_states == a2.final_states
+
+    lines[2] = '{"state": 2, "transitions": {"1": [2, 5]}}'
+    with pytest.raises(FsmError, match='Line 3'):
+        Fsm.from_ndjson(lines)
+    with pytest.raises(FsmError):
+        Fsm.from_ndjson([])
+    lines[2] = lines[1]
+    with pytest.raises(FsmError, match='Line 3: The transitions of 1'):
+        Fsm.from_ndjson(lines)
@@ -0,0 +1,72 @@
+"""
+Tests for the Lexer class.
+"""
+import mmap
+import pytest
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.lexer import Lexer, Token
+from fsmdot.error import FsmError
+
+DIGITS = set('0123456789')
+LETTERS = set('abcdefghijklmnopqrstuvwxyz')
+
+
+@pytest.fixture
+def lexer():
+    """Keywords, identifiers, numbers, operators and spaces."""
+    ident = Dfa({0, 1}, LETTERS | DIGITS, {
+        0: {c: 1 for c in LETTERS},
+        1: {c: 1 for c in LETTERS | DIGITS}
+    }, 0, {1})
+    number = Nfa({0, 1}, DIGITS, {
+        0: {c: {1} for c in DIGITS},
+        1: {c: {1} for c in DIGITS}
+    }, 0, {1})
+    space = Dfa({0, 1}, {' ', '\n'}, {
+        0: {' ': 1, '\n': 1},
+        1: {' ': 1, '\n': 1}
+    }, 0, {1})
+    return Lexer([
+        ('keyword', Dfa.from_words(['if', 'in'])),
+        ('ident', ident),
+        ('number', number),
+        ('op', Dfa.from_words(['+', '=', '=='])),
+        ('space', space)
+    ], skip={'space'})
+
+
+def test_tokenize(lexer):
+    tokens = list(lexer.tokenize('if x1 == 42 + inside'))
+    assert tokens[0] == Token('keyword', 'if', 0, 2)
+    assert [t.kind for t in tokens] == [
+        'keyword', 'ident', 'op', 'number', 'op', 'ident'
+    ]
+    assert [t.value for t in tokens] == ['if', 'x1', '==', '42', '+', 'inside']
+    assert list(lexer.tokenize('a=b', start=1)) == [
+        Token('op', '=', 1, 2), Token('ident', 'b', 2, 3)
+    ]
+    with pytest.raises(FsmError):
+        list(lexer.tokenize('x = ?'))
+
+
+def test_tokenize_bytes(lexer, tmp_path):
+    expected = [(b'if', 0, 2), (b'x1', 3, 5), (b'==', 6, 8), (b'42', 9, 11)]
+    tokens = lexer.tokenize(b'if x1 == 42\n')
+    assert [(t.value, t.start, t.end) for t in tokens] == expected
+    path = tmp_path / 'input.txt'
+    path.write_bytes(b'if x1 == 42\n')
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            tokens = lexer.tokenize(mm)
+            assert [(t.value, t.start, t.end) for t in tokens] == expected
+
+
+def test_backtracking():
+    """'aaa...a' with the rules a and a*b: each token is a single a."""
+    ab = Dfa({0, 1}, {'a', 'b'}, {0: {'a': 0, 'b': 1}}, 0, {1})
+    lexer = Lexer([('a', Dfa.from_words(['a'])), ('ab', ab)])
+    tokens = list(lexer.tokenize('a' * 1000))
+    assert len(tokens) == 1000
+    assert tokens[-1] == Token('a', 'a', 999, 1000)
+    assert list(lexer.tokenize('aab')) == [Token('ab', 'aab', 0, 3)]
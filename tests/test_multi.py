@@ -0,0 +1,53 @@
+"""
+Tests for the MultiDfa class.
+"""
+import pytest
+from fsmdot.dfa import Dfa
+from fsmdot.nfa import Nfa
+from fsmdot.multi import MultiDfa
+from fsmdot.error import FsmError
+
+
+@pytest.fixture
+def patterns():
+    """Words, strings ending with a and the word abc."""
+    return [
+        Dfa.from_words(['ab', 'abc', 'b']),
+        Nfa({0, 1}, {'a', 'b'}, {0: {'a': {0, 1}, 'b': {0}}}, 0, {1}),
+        Nfa({0, 1}, {'a', 'b', 'c', Nfa.EPSILON}, {
+            0: {Nfa.EPSILON: {1}}
+        }, 0, {1}),
+    ]
+
+
+def test_match(patterns):
+    m = MultiDfa.from_patterns(patterns)
+    assert m.symbols == {'a', 'b', 'c'}
+    for string in ['', 'a', 'b', 'ab', 'abc', 'ba', 'bac', 'aab']:
+        expected = set()
+        for i, p in enumerate(patterns):
+            try:
+                if p.accept(string):
+                    expected.add(i)
+            except FsmError:
+                pass
+        assert m.match(string) == expected, string
+        assert m.accept(string) == bool(expected)
+    assert m.match_mask('abc') == 0b001
+    assert m.match_mask('') == 0b100
+    with pytest.raises(FsmError):
+        m.match('d')
+
+
+def test_mutation(patterns):
+    m = MultiDfa.from_patterns(patterns[:2])
+    assert m.match('ba') == {1}
+    m.add_state('x', 0b110)
+    m.add_transition(m.initial_state, 'c', 'x')
+    assert m.match('c') == {1, 2}
+    assert 'x' in m.final_states
+    m.set_tag('x', 0)
+    assert m.match('c') == set()
+    assert not m.accept('c')
+    with pytest.raises(FsmError):
+        m.to_json()
@@ -5,7 +5,9 @@ Automatons are inspired by Wikipedia:
 https://en.wikipedia.org/wiki/Nondeterministic_finite_automaton
 """
 import pytest
+from fsmdot.dfa import Dfa
 from fsmdot.nfa import Nfa
+from fsmdot.error import FsmError, StateLimitError
 
 
 @pytest.fixture
@@ -160,3 +162,124 @@ def test_to_dfa(a3, a4):
     assert dfa3.accept('011101100')
     assert a4.accept('1001011100')
     assert dfa4.accept('1001011100')
+    assert len(a3.to_dfa(max_states=4).states) == 4
+    with pytest.raises(StateLimitError):
+        a4.to_dfa(max_states=10)
+    with pytest.raises(FsmError):
+        a3.to_dfa(max_states=3)
+
+
+def test_epsilon_cycle():
+    Q = {0, 1, 2}
+    S = {'a', Nfa.EPSILON}
+    d = {
+        0: {
+            Nfa.EPSILON: {1}
+        },
+        1: {
+            Nfa.EPSILON: {0, 2}
+        },
+        2: {
+            'a': {0}
+        }
+    }
+    a = Nfa(Q, S, d, 0, {2})
+    assert a.epsilon_closure(0) == {0, 1, 2}
+    assert a.accept('aaa')
+
+
+def test_compile(a1, a2, a3, a4):
+    strings = ['', '0', '1', '10', '01', '1001', '10101', '011101100']
+    for a in [a1, a2, a3, a4]:
+        t = a.compile()
+        assert t.unmask(t.initial) == a.epsilon_closure(a.initial_state)
+        for string in strings:
+            assert t.accept(string) == a.accept(string)
+    t = a4.compile()
+    t.tables = None
+    for string in strings:
+        assert t.accept(string) == a4.accept(string)
+
+
+def test_reverse(a2, a3):
+    r = a3.reverse()
+    for string in ['', '0', '01', '011101100', '0011', '1110']:
+        assert r.accept(string[::-1]) == a3.accept(string)
+    r = a2.to_dfa().reverse()
+    assert r.has_epsilon_moves()
+    for string in ['1001', '10101', '10', '01', '110']:
+        assert r.accept(string[::-1]) == a2.accept(string)
+    r = Dfa.from_words(['a', 'ab']).reverse()
+    assert r.states == {0, 1, 2, 3} and r.initial_state == 3
+    assert len(r.tabulate().splitlines()) == 11
+
+
+def test_minimal_dfa(a1, a2, a3, a4):
+    strings = ['', '0', '1', '10', '1001', '10101', '011101100']
+    for a in [a1, a2, a3, a4]:
+        dfas = [a.minimal_dfa(m) for m in ['auto', 'hopcroft', 'brzozowski']]
+        assert dfas[0].states == dfas[1].states == dfas[2].states
+        assert dfas[0].initial_state == 0
+        for string in strings:
+            assert dfas[0].accept(string) == a.accept(string)
+            assert dfas[2].accept(string) == a.accept(string)
+    assert len(a4.minimal_dfa().states) == 16
+
+
+def test_is_universal(a1, a2):
+    assert not a1.is_universal()
+    assert not a2.is_universal()
+    d = {
+        'p': {'0': {'p', 'r'}, '1': {'p', 'q'}},
+        'i': {Nfa.EPSILON: {'p'}}
+    }
+    a = Nfa({'i', 'p', 'q', 'r'}, {'0', '1', Nfa.EPSILON}, d, 'i', {'i', 'q'})
+    assert not a.is_universal()
+    a.set_final('r')
+    assert a.is_universal()
+    assert Nfa({0}, set(), dict(), 0, {0}).is_universal()
+
+
+def test_is_subset_of(a1, a2, a3, a4):
+    assert a4.is_subset_of(a4)
+    assert a4.is_subset_of(a4.minimal_dfa())
+    assert not a4.is_subset_of(a1.reverse())
+    d = {'p': {'0': {'p'}, '1': {'q'}}, 'q': {'0': {'q'}, '1': {'q'}}}
+    one = Nfa({'p', 'q'}, {'0', '1'}, d, 'p', {'q'})
+    assert a1.is_subset_of(one)
+    assert a4.is_subset_of(one)
+    assert not one.is_subset_of(a1)
+    assert not a4.is_subset_of(a1)
+    assert not a1.is_subset_of(a2)
+    assert a3.is_subset_of(a3.to_dfa())
+    assert a3.to_dfa().reverse().reverse().is_subset_of(a3)
+    empty = Nfa({0}, {'0'}, dict(), 0, set())
+    assert empty.is_subset_of(a1)
+    assert not a2.is_subset_of(empty)
+
+
+def test_reduce(a2, a3, a4):
+    strings = ['', '0', '1', '10', '1001', '10101', '011101100']
+    for a in [a2, a3, a4]:
+        r = a.reduce()
+        assert len(r.states) <= len(a.states)
+        for string in strings:
+            assert r.accept(string) == a.accept(string)
+        assert r.to_dfa().minimize().canonical_hash() == \
+            a.to_dfa().minimize().canonical_hash()
+    # Two copies of the same branch and useless states
+    d = {
+        0: {'a': {1, 3}},
+        1: {'b': {2}},
+        3: {'b': {4}},
+        5: {'a': {5}},
+        6: {'a': {0}}
+    }
+    r = Nfa(set(range(7)), {'a', 'b'}, d, 0, {2, 4}).reduce()
+    assert r.states == {'0', '{1, 3}', '{2, 4}'}
+    assert r.final_states == {'{2, 4}'}
+    assert r.tabulate().count('\n') == 8
+    assert r.reduce().states == r.states
+    assert Nfa.from_json(r.to_json()).accept('ab')
+    r = Nfa({0, 1}, {'a'}, {1: {'a': {1}}}, 0, {1}).reduce()
+    assert r.states == {0} and not r.final_states
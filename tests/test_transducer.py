@@ -0,0 +1,89 @@
+"""
+Tests for the Mealy and Moore classes.
+
+Machines are inspired by Wikipedia:
+https://en.wikipedia.org/wiki/Mealy_machine
+"""
+import pytest
+from fsmdot.mealy import Mealy
+from fsmdot.moore import Moore
+from fsmdot.error import FsmError
+
+
+@pytest.fixture
+def m1():
+    """Outputs 1 when the input symbol is equal to the previous one."""
+    Q = {'S0', 'S1', 'S2'}
+    S = {0, 1}
+    d = {
+        'S0': {
+            0: ('S1', 0),
+            1: ('S2', 0)
+        },
+        'S1': {
+            0: ('S1', 1),
+            1: ('S2', 0)
+        },
+        'S2': {
+            0: ('S1', 0),
+            1: ('S2', 1)
+        }
+    }
+    return Mealy(Q, S, d, 'S0')
+
+
+@pytest.fixture
+def m2():
+    """Outputs the number of a seen modulo 3."""
+    Q = {0, 1, 2}
+    S = {'a', 'b'}
+    d = {
+        0: {'a': 1, 'b': 0},
+        1: {'a': 2, 'b': 1},
+        2: {'a': 0, 'b': 2}
+    }
+    return Moore(Q, S, d, 0, {0: '0', 1: '1', 2: '2'})
+
+
+def test_mealy(m1):
+    assert m1.transduce([0, 0, 1, 1, 1, 0]) == [0, 1, 0, 1, 1, 0]
+    buffer = bytearray(10)
+    assert m1.transduce(bytes([1, 1, 0]), buffer) == 3
+    assert buffer[:3] == bytearray([0, 1, 0])
+    assert list(m1.transduce_chunks([[0, 0], [], [0, 1]])) == [
+        [0, 1], [], [1, 0]
+    ]
+    with pytest.raises(FsmError):
+        m1.transduce([2])
+    with pytest.raises(FsmError):
+        Mealy({'S0'}, {0}, {'S0': {0: 'S0'}}, 'S0')
+
+
+def test_mealy_mutations(m1):
+    m1.add_state('S3')
+    m1.add_transition('S2', 1, 'S3', 2)
+    assert m1.transduce([1, 1]) == [0, 2]
+    with pytest.raises(FsmError):
+        m1.transduce([1, 1, 1])
+    m1.remove_transition('S2', 1)
+    with pytest.raises(FsmError):
+        m1.transduce([1, 1])
+
+
+def test_moore(m2):
+    assert ''.join(m2.transduce('abaa')) == '01120'
+    buffer = [None] * 5
+    assert m2.transduce('aaaa', buffer) == 5
+    assert buffer == ['0', '1', '2', '0', '1']
+    assert list(m2.transduce_chunks(['a', 'ba'])) == [['0', '1'], ['1', '2']]
+    m2.set_output(2, 'two')
+    assert m2.transduce('aa') == ['0', '1', 'two']
+
+
+def test_export(m1, m2):
+    assert list(m1.table_rows())[1] == ['-> S0', 'S1/0', 'S2/0']
+    assert list(m2.table_rows())[1] == ['-> 0/0', '1', '0']
+    G = m1.dot_graph()
+    assert G.get_edge('S0', 'S1').attr['label'] == '0/0'
+    G = m2.dot_graph()
+    assert G.get_node(1).attr['label'] == '1/1'